@@ -1,34 +1,66 @@
-from flask import Flask, request, render_template
-from flask_cors import CORS
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from datetime import timedelta
-from flask_jwt_extended import (
-    JWTManager, create_access_token, create_refresh_token,
-    jwt_required, get_jwt_identity, get_jwt
-)
-from werkzeug.security import check_password_hash
-
-app = Flask(__name__)
-cors = CORS(app, resources={r"/api/*": {"origins": "*"}})
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
-
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
-import model
-import routes
-# --- JWT config ---
-app.config["JWT_SECRET_KEY"] = "9049458495848574755"  # put in ENV in production
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=30)
-app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=7)
-
-jwt = JWTManager(app)
-
-
-@app.route('/')
-def home():
-    return render_template('index.html')
+import os
+
+from flask import Flask
+
+from config import Config, configure_database
+from extensions import cors, db, jwt
+from utils.database import configure_engines
+from utils.json_provider import init_json
+
+
+def create_app(config=None):
+    """Build an app instance; ``config`` is a dict or config object applied over ``Config``."""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+    configure_database(app.config)
+    app.config['USE_X_SENDFILE'] = app.config['STATIC_ACCEL_MODE'] == 'x-sendfile'
+    init_json(app)
+
+    cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
+    db.init_app(app)
+    configure_engines(app, db)
+    if app.config['METRICS_ENABLED']:
+        from utils.metrics import init_metrics
+        init_metrics(app, db)
+    if app.config['COMPRESS_ENABLED']:
+        from utils.compression import init_compression
+        init_compression(app)  # after metrics, so app_response_bytes_total counts wire bytes
+    if app.config['SLOW_QUERY_MS']:
+        from utils.slow_queries import init_slow_query_log
+        init_slow_query_log(app, db)
+    if app.config['DB_MIGRATIONS']:
+        from flask_migrate import Migrate  # pulls in Alembic, only `flask db` needs it
+        Migrate(app, db)
+    jwt.init_app(app)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    import model  # registers the tables on db.metadata
+    from routes import LazyBlueprints, register_blueprints
+    if app.config['LAZY_BLUEPRINTS']:
+        app.wsgi_app = LazyBlueprints(app, app.config['API_BLUEPRINTS'])
+    else:
+        register_blueprints(app, app.config['API_BLUEPRINTS'])
+
+    from commands import register_commands
+    register_commands(app)
+
+    if app.config['PRODUCT_CODE_WARM']:
+        from services.product_codes import warm_at_startup
+        warm_at_startup(app, db)
+    if app.config['PRODUCT_PRICE_WARM']:
+        from services.product_prices import warm_prices_at_startup
+        warm_prices_at_startup(app, db)
+
+    from utils.image_gc import start_image_gc
+    from services.stock import start_stock_compaction
+    start_image_gc(app, db)
+    start_stock_compaction(app, db)
+    return app
 
 
 if __name__ == '__main__':
-    app.run()
+    create_app().run()
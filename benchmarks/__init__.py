@@ -0,0 +1,6 @@
+"""Repeatable endpoint timings against a synthetic SQLite database.
+
+    python -m benchmarks.generate --rows 100k instance/bench.db
+    python -m benchmarks.run instance/bench.db -o results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.compare results/old.json results/new.json
+"""
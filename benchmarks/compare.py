@@ -0,0 +1,37 @@
+import json
+
+import click
+
+
+def compare(old, new, threshold):
+    """Rows of (case, old median, new median, ratio, flag) for cases present in both runs."""
+    rows = []
+    for name, result in new['results'].items():
+        before = old['results'].get(name)
+        if before is None:
+            continue
+        ratio = result['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        flag = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+        rows.append((name, before['median_ms'], result['median_ms'], ratio, flag))
+    return rows
+
+
+@click.command()
+@click.argument('old', type=click.File())
+@click.argument('new', type=click.File())
+@click.option('--threshold', default=0.2, show_default=True, help='Relative median change worth flagging.')
+def main(old, new, threshold):
+    """Compare two benchmark result files; exits 1 when any case got slower."""
+    old, new = json.load(old), json.load(new)
+    if old['meta']['rows'] != new['meta']['rows']:
+        click.echo('warning: the runs used different databases', err=True)
+    click.echo(f'{"case":36} {old["meta"]["commit"] or "old":>10} {new["meta"]["commit"] or "new":>10}  ratio')
+    rows = compare(old, new, threshold)
+    for name, before, after, ratio, flag in rows:
+        click.echo(f'{name:36} {before:>10.2f} {after:>10.2f}  {ratio:5.2f} {flag}')
+    if any(flag == 'slower' for *_, flag in rows):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
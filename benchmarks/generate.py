@@ -0,0 +1,179 @@
+import os
+import random
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+
+import click
+from werkzeug.security import generate_password_hash
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from utils.dates import sale_day  # noqa: E402
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+CATEGORIES = (
+    'Beverages', 'Snacks', 'Dairy', 'Bakery', 'Frozen', 'Produce', 'Meat', 'Seafood', 'Pantry',
+    'Household', 'Personal Care', 'Baby', 'Pet', 'Stationery', 'Electronics', 'Toys',
+)
+ADJECTIVES = ('Fresh', 'Classic', 'Organic', 'Family', 'Mini', 'Premium', 'Spicy', 'Light', 'Extra', 'Value')
+PAYMENT_METHODS = (('cash', 50), ('card', 30), ('qr', 15), ('bank_transfer', 5))
+DAYS = 730  # two years of sales, ending today
+LINES_PER_INVOICE = (1, 8)
+BATCH = 50_000
+
+
+def parse_rows(value):
+    value = value.lower()
+    return SCALES[value] if value in SCALES else int(value)
+
+
+def create_schema(path):
+    """Empty database at ``path`` built by the real migrations (FTS tables and triggers included)."""
+    from flask_migrate import upgrade
+    uri = 'sqlite:///' + os.path.abspath(path)
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_DATABASE_READ_URI': uri,
+        'PRODUCT_CODE_WARM': False,
+        'PRODUCT_PRICE_WARM': False,
+    })
+    with app.app_context():
+        upgrade(directory=os.path.join(app.root_path, 'migrations'))
+        for engine in set(db.engines.values()):
+            engine.dispose()
+
+
+def _batches(rows, size=BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(path, rows, seed=42):
+    """Seed ``path`` with ``rows`` invoice_detail rows plus proportional users, products and invoices.
+
+    Same ``rows`` and ``seed`` give the same database, so timings are comparable
+    between commits. Returns the row counts per table.
+    """
+    if os.path.exists(path):
+        raise click.ClickException(f'{path} exists; remove it first')
+    rng = random.Random(seed)
+    create_schema(path)
+
+    n_products = min(max(50, rows // 200), 20_000)
+    n_users = min(max(5, rows // 20_000), 200)
+    today = date.today()
+    first_day = today - timedelta(days=DAYS - 1)
+    created = datetime.combine(first_day, datetime.min.time())
+
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.execute('PRAGMA synchronous=OFF')
+    password = generate_password_hash('bench')
+    conn.executemany(
+        'INSERT INTO category (id, name, create_at) VALUES (?, ?, ?)',
+        [(i, name, first_day) for i, name in enumerate(CATEGORIES, 1)],
+    )
+    conn.executemany(
+        'INSERT INTO user (id, name, password, email, role, create_at) VALUES (?, ?, ?, ?, ?, ?)',
+        [(i, f'user{i}', password, f'user{i}@example.com', 'admin' if i == 1 else 'staff', created)
+         for i in range(1, n_users + 1)],
+    )
+    prices = {}
+    products = []
+    for i in range(1, n_products + 1):
+        category = rng.randrange(len(CATEGORIES)) + 1
+        prices[i] = rng.randrange(50, 50_000)
+        products.append((
+            i, category, f'{rng.choice(ADJECTIVES)} {CATEGORIES[category - 1]} {i}', f'{890000000000 + i:013d}',
+            10_000_000, prices[i], f'{CATEGORIES[category - 1]} item {i}', first_day,
+        ))
+    conn.executemany(
+        'INSERT INTO product (id, category_id, name, sku, stock, price, description, create_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        products,
+    )
+    # Opening stock as a compacted ledger, so `flask stock verify` agrees with product.stock
+    conn.executemany(
+        'INSERT INTO stock_snapshot (product_id, qty, last_movement_id, create_at) VALUES (?, ?, 0, ?)',
+        [(product[0], product[4], created) for product in products],
+    )
+
+    # Skewed popularity: a few products and cashiers account for most lines
+    product_ids = list(range(1, n_products + 1))
+    product_weights = [1 / rank for rank in range(1, n_products + 1)]
+    user_weights = [1 / rank for rank in range(1, n_users + 1)]
+    methods, method_weights = zip(*PAYMENT_METHODS)
+
+    # Lines are dealt out in invoice order; invoices span DAYS evenly, oldest first
+    counts = []
+    remaining = rows
+    while remaining:
+        count = min(rng.randint(*LINES_PER_INVOICE), remaining)
+        counts.append(count)
+        remaining -= count
+    n_invoices = len(counts)
+
+    line_id = 0
+
+    def invoice_rows():
+        nonlocal line_id
+        for invoice_id, count in enumerate(counts, 1):
+            day = first_day + timedelta(days=(invoice_id - 1) * DAYS // n_invoices)
+            chosen = rng.choices(product_ids, product_weights, k=count)
+            lines = []
+            total = 0
+            for product_id in chosen:
+                qty = rng.randint(1, 5)
+                subtotal = qty * prices[product_id]
+                total += subtotal
+                line_id += 1
+                lines.append((line_id, invoice_id, product_id, qty, prices[product_id], subtotal,
+                              f'{day} 12:00:00', sale_day(day)))
+            invoice = (
+                invoice_id, f'{invoice_id:03}', rng.choices(range(1, n_users + 1), user_weights)[0],
+                f'Customer {rng.randrange(100_000)}', f'0{rng.randrange(10**8, 10**9)}', day, sale_day(day),
+                total, count, rng.choices(methods, method_weights)[0], None,
+            )
+            yield invoice, lines
+
+    for batch in _batches(invoice_rows(), BATCH // 4):
+        conn.executemany(
+            'INSERT INTO invoice (id, invoice_number, user_id, customer_name, customer_phone, create_at, '
+            'sale_day, total_amount, line_count, payment_method, remark) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [invoice for invoice, _ in batch],
+        )
+        conn.executemany(
+            'INSERT INTO invoice_detail (id, invoice_id, product_id, qty, price, subtotal, create_at, sale_day) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [line for _, lines in batch for line in lines],
+        )
+        conn.commit()
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+    return {'category': len(CATEGORIES), 'user': n_users, 'product': n_products,
+            'invoice': n_invoices, 'invoice_detail': rows}
+
+
+@click.command()
+@click.argument('path')
+@click.option('--rows', default='10k', show_default=True,
+              help=f'invoice_detail rows: a number or one of {", ".join(SCALES)}.')
+@click.option('--seed', default=42, show_default=True)
+def main(path, rows, seed):
+    """Create a synthetic benchmark database at PATH."""
+    counts = generate(path, parse_rows(rows), seed)
+    click.echo(', '.join(f'{table}: {count}' for table, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
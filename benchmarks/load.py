@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'bench'  # every user benchmarks.generate creates
+REPORTS = [f'/api/sales_report/generate/{criteria}{period}'
+           for criteria in ('', 'product/', 'category/', 'user/')
+           for period in ('daily', 'weekly', 'monthly')]
+
+# Virtual users per role; --cashiers/--managers/--terminals override one mix entry
+MIXES = {
+    'checkout': {'cashier': 8, 'manager': 0, 'terminal': 2},
+    'dashboard': {'cashier': 2, 'manager': 6, 'terminal': 2},
+    'store': {'cashier': 6, 'manager': 2, 'terminal': 4},
+}
+# Seconds between a virtual user's actions, scaled by --think (0 = back to back)
+THINK = {'cashier': 0.5, 'manager': 5.0, 'terminal': 2.0}
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client; enough for JSON requests against the local server."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+        self.headers = {}
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(payload)}']
+        if body is not None:
+            head.append('Content-Type: application/json')
+        head += [f'{k}: {v}' for k, v in self.headers.items()]
+        self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + payload)
+        try:
+            status, headers, data = await self._response()
+        except (ConnectionError, asyncio.IncompleteReadError, HTTPError):
+            await self.close()
+            raise
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, data
+
+    async def _response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HTTPError('connection closed')
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            await self.reader.readline()
+            data = b''.join(chunks)
+        elif 'content-length' in headers:
+            data = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            data = await self.reader.read()
+            headers['connection'] = 'close'
+        return status, headers, data
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)  # route -> [(seconds, outcome)]
+
+    async def call(self, conn, route, method, path, body=None):
+        """Time one request; returns the decoded JSON body, or None when it failed."""
+        start = time.perf_counter()
+        try:
+            status, data = await conn.request(method, path, body)
+        except (OSError, asyncio.IncompleteReadError, HTTPError):
+            self.samples[route].append((time.perf_counter() - start, 'error'))
+            return None
+        elapsed = time.perf_counter() - start
+        locked = status == 503 or b'database is locked' in data
+        self.samples[route].append((elapsed, 'locked' if locked else 'error' if status >= 400 else 'ok'))
+        if status >= 400:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(recorder, seconds):
+    routes = {}
+    for route, samples in sorted(recorder.samples.items()):
+        ordered = sorted(elapsed for elapsed, _ in samples)
+        outcomes = [outcome for _, outcome in samples]
+        routes[route] = {
+            'requests': len(samples),
+            'rps': round(len(samples) / seconds, 2),
+            'p50_ms': round(_percentile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(_percentile(ordered, 0.95) * 1000, 2),
+            'p99_ms': round(_percentile(ordered, 0.99) * 1000, 2),
+            'error_rate': round(outcomes.count('error') / len(samples), 4),
+            'lock_timeout_rate': round(outcomes.count('locked') / len(samples), 4),
+        }
+    return routes
+
+
+async def _think(rng, role, scale):
+    if scale:
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * THINK[role] * scale)
+
+
+async def cashier(conn, rec, rng, world, deadline, think):
+    """Log in once, then ring up invoices line by line."""
+    user = rng.randrange(world['users']) + 1
+    token = await rec.call(conn, 'POST /login', 'POST', '/login', {'name': f'user{user}', 'password': PASSWORD})
+    if token:
+        conn.headers['Authorization'] = f'Bearer {token["access_token"]}'
+    while time.monotonic() < deadline:
+        created = await rec.call(conn, 'POST /api/invoices/create', 'POST', '/api/invoices/create', {
+            'user_id': user, 'customer_name': 'Walk-in', 'customer_phone': '012345678', 'payment_method': 'cash',
+        })
+        if not created or 'Invoices' not in created:
+            await _think(rng, 'cashier', think)
+            continue
+        for _ in range(rng.randint(1, 8)):
+            if time.monotonic() >= deadline:
+                break
+            await _think(rng, 'cashier', think)
+            await rec.call(conn, 'POST /api/invoice_details/create', 'POST', '/api/invoice_details/create', {
+                'invoice_id': created['Invoices']['id'],
+                'product_id': rng.randrange(world['products']) + 1,
+                'qty': rng.randint(1, 3),
+            })
+
+
+async def manager(conn, rec, rng, world, deadline, think):
+    """Refresh a report, look at it for a while, repeat."""
+    while time.monotonic() < deadline:
+        path = rng.choice(REPORTS)
+        await rec.call(conn, f'GET {path}', 'GET', path)
+        await _think(rng, 'manager', think)
+
+
+async def terminal(conn, rec, rng, world, deadline, think):
+    """Price display / self-checkout screen polling the catalog."""
+    while time.monotonic() < deadline:
+        await rec.call(conn, 'GET /api/products', 'GET', '/api/products')
+        await _think(rng, 'terminal', think)
+
+
+ROLES = {'cashier': cashier, 'manager': manager, 'terminal': terminal}
+
+
+async def _virtual_user(role, host, port, rec, rng, world, deadline, think):
+    conn = Connection(host, port)
+    try:
+        await ROLES[role](conn, rec, rng, world, deadline, think)
+    finally:
+        await conn.close()
+
+
+async def replay(host, port, mix, world, duration, think, seed):
+    rec = Recorder()
+    deadline = time.monotonic() + duration
+    users = []
+    for role, count in mix.items():
+        for i in range(count):
+            rng = random.Random(f'{seed}-{role}-{i}')
+            users.append(_virtual_user(role, host, port, rec, rng, world, deadline, think))
+    started = time.monotonic()
+    await asyncio.gather(*users)
+    return rec, time.monotonic() - started
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path, port, command=None):
+    """Serve the app against ``db_path``; ``command`` may use {port} (e.g. a gunicorn line)."""
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.abspath(db_path), FLASK_APP='app')
+    env.pop('DATABASE_READ_URL', None)
+    if command:
+        # Server logs go to a file, not an unread pipe: a full pipe would stall the server
+        log = tempfile.TemporaryFile()
+        args = command.format(port=port)
+        proc = subprocess.Popen(args, shell=True, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    else:
+        log = None
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'flask', 'run', '--port', str(port), '--with-threads', '--no-reload',
+             '--no-debugger'],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise click.ClickException(f'server exited with {proc.returncode}' + _log_tail(log))
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            if log is not None:
+                log.close()  # the server keeps its own handle
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise click.ClickException('server did not start within 30s' + _log_tail(log))
+
+
+def _log_tail(log, size=4096):
+    if log is None:
+        return ''
+    log.seek(max(0, log.seek(0, os.SEEK_END) - size))
+    tail = log.read().decode(errors='replace')
+    log.close()
+    return f':\n{tail}' if tail else ''
+
+
+def _world(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {
+            'users': conn.execute('SELECT COUNT(*) FROM user').fetchone()[0],
+            'products': conn.execute('SELECT COUNT(*) FROM product').fetchone()[0],
+        }
+
+
+@click.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--mix', type=click.Choice(sorted(MIXES)), default='store', show_default=True)
+@click.option('--cashiers', type=int, help='Override the mix: concurrent cashiers.')
+@click.option('--managers', type=int, help='Override the mix: concurrent report pollers.')
+@click.option('--terminals', type=int, help='Override the mix: concurrent catalog pollers.')
+@click.option('--duration', default=30.0, show_default=True, help='Seconds of traffic.')
+@click.option('--think', default=1.0, show_default=True, help='Think-time scale; 0 sends requests back to back.')
+@click.option('--seed', default=42, show_default=True)
+@click.option('--server', 'command', help="Server command with {port}, e.g. \"gunicorn -w 4 -b 127.0.0.1:{port} 'app:create_app()'\".")
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Write the JSON results here (default stdout).')
+def main(path, mix, cashiers, managers, terminals, duration, think, seed, command, output):
+    """Start the app on a scratch copy of PATH and replay a concurrent traffic mix against it."""
+    mix = dict(MIXES[mix])
+    for role, count in (('cashier', cashiers), ('manager', managers), ('terminal', terminals)):
+        if count is not None:
+            mix[role] = count
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = os.path.join(tmp, 'load.db')
+        shutil.copyfile(path, scratch)
+        world = _world(scratch)
+        port = _free_port()
+        proc = start_server(scratch, port, command)
+        try:
+            rec, seconds = asyncio.run(replay('127.0.0.1', port, mix, world, duration, think, seed))
+        finally:
+            proc.terminate()
+            proc.wait(10)
+
+    routes = summarize(rec, seconds)
+    for route, r in routes.items():
+        click.echo(f'{route:52} {r["rps"]:>8.1f}/s  p50 {r["p50_ms"]:>8.1f}  p95 {r["p95_ms"]:>8.1f}  '
+                   f'p99 {r["p99_ms"]:>8.1f} ms  err {r["error_rate"]:.2%}  locked {r["lock_timeout_rate"]:.2%}',
+                   err=True)
+    report = json.dumps({
+        'meta': {
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'database': os.path.abspath(path),
+            'server': command or 'flask run --with-threads',
+            'mix': mix,
+            'duration': round(seconds, 2),
+            'think': think,
+            'seed': seed,
+        },
+        'total_rps': round(sum(len(s) for s in rec.samples.values()) / seconds, 2),
+        'routes': routes,
+    }, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        click.echo(report)
+
+
+if __name__ == '__main__':
+    main()
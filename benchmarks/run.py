@@ -0,0 +1,177 @@
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+
+
+def _ids(conn):
+    """Representative ids from the seeded database: a popular product, a mid-range invoice, ..."""
+    one = lambda sql: conn.execute(sql).fetchone()[0]  # noqa: E731
+    invoice_id = one('SELECT id FROM invoice ORDER BY id LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM invoice)')
+    return {
+        'product_id': 1,
+        'sku': one('SELECT sku FROM product WHERE id = 1'),
+        'category_id': one('SELECT category_id FROM product WHERE id = 1'),
+        'user_id': 1,
+        'invoice_id': invoice_id,
+        'invoice_ids': ','.join(str(invoice_id + i) for i in range(20)),
+        'line_id': one(f'SELECT MIN(id) FROM invoice_detail WHERE invoice_id = {invoice_id}'),
+        'product_ids': ','.join(str(i) for i in range(1, 51)),
+    }
+
+
+def _checkout(client, ids):
+    """Cashier flow: open an invoice, then post a three-item basket to it."""
+    response = client.post('/api/invoices/create', json={
+        'user_id': ids['user_id'], 'customer_name': 'Bench', 'customer_phone': '012345678',
+        'payment_method': 'cash',
+    })
+    if response.status_code != 200:
+        return response
+    return client.post('/api/invoice_details/basket', json={
+        'invoice_id': response.get_json()['Invoices']['id'],
+        'items': [{'product_id': pid, 'qty': 1} for pid in (1, 2, 3)],
+    })
+
+
+# (name, method, url template) run through the test client; callables drive multi-request flows
+CASES = [
+    ('products.list', 'GET', '/api/products'),
+    ('categories.list', 'GET', '/api/category'),
+    ('users.list', 'GET', '/api/users'),
+    ('invoices.list', 'GET', '/api/invoices'),
+    ('invoice_details.list', 'GET', '/api/invoice_details'),
+    ('products.get', 'GET', '/api/products/list/{product_id}'),
+    ('products.by_code', 'GET', '/api/products/by-code/{sku}'),
+    ('products.search', 'GET', '/api/products/search?q=fresh'),
+    ('categories.get', 'GET', '/api/category/list/{category_id}'),
+    ('users.get', 'GET', '/api/users/list/{user_id}'),
+    ('invoices.get', 'GET', '/api/invoices/list/{invoice_id}'),
+    ('invoices.full', 'GET', '/api/invoices/{invoice_id}/full'),
+    ('invoices.full_batch', 'GET', '/api/invoices/full?ids={invoice_ids}'),
+    ('invoice_details.get', 'GET', '/api/invoice_details/list/{line_id}'),
+    ('stock.get', 'GET', '/api/stock/{product_id}'),
+    ('stock.batch', 'GET', '/api/stock?ids={product_ids}'),
+    ('dashboard.summary', 'GET', '/api/dashboard/summary'),
+    ('checkout', 'POST', _checkout),
+] + [
+    (f'sales_report.{criteria or "sale"}.{period}', 'GET',
+     f'/api/sales_report/generate/{criteria + "/" if criteria else ""}{period}')
+    for criteria in ('', 'product', 'category', 'user')
+    for period in ('daily', 'weekly', 'monthly')
+]
+
+
+def _request(client, method, target, ids):
+    if callable(target):
+        return target(client, ids)
+    return client.open(target.format(**ids), method=method)
+
+
+def time_case(client, method, target, ids, repeat, warmup):
+    for _ in range(warmup):
+        _request(client, method, target, ids)
+    timings = []
+    statuses = set()
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = _request(client, method, target, ids)
+        data = response.get_data()
+        timings.append(time.perf_counter() - start)
+        statuses.add(response.status_code)
+        size = len(data)
+    timings.sort()
+    return {
+        'repeat': repeat,
+        'min_ms': round(timings[0] * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'statuses': sorted(statuses),
+        'bytes': size,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(path, repeat=5, warmup=1, only=None):
+    """Time every case against a scratch copy of ``path`` (checkout writes never touch the seed)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = os.path.join(tmp, 'bench.db')
+        shutil.copyfile(path, scratch)
+        with sqlite3.connect(scratch) as conn:
+            ids = _ids(conn)
+            rows = {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                    for table in ('product', 'user', 'invoice', 'invoice_detail')}
+        uri = 'sqlite:///' + scratch
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': uri,
+            'SQLALCHEMY_DATABASE_READ_URI': uri,
+            'METRICS_ENABLED': False,
+            'SLOW_QUERY_MS': 0,
+        })
+        client = app.test_client()
+        results = {}
+        for name, method, target in CASES:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = time_case(client, method, target, ids, repeat, warmup)
+            click.echo(f'{name:36} {results[name]["median_ms"]:>10.2f} ms  {results[name]["statuses"]}', err=True)
+        with app.app_context():
+            for engine in set(db.engines.values()):
+                engine.dispose()
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'database': os.path.abspath(path),
+            'rows': rows,
+            'repeat': repeat,
+            'warmup': warmup,
+        },
+        'results': results,
+    }
+
+
+@click.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Write the JSON results here (default stdout).')
+@click.option('--repeat', default=5, show_default=True, help='Timed requests per case.')
+@click.option('--warmup', default=1, show_default=True, help='Untimed requests per case first.')
+@click.option('--only', multiple=True, help='Case name prefix to run (repeatable), e.g. sales_report.')
+def main(path, output, repeat, warmup, only):
+    """Time the API against the benchmark database at PATH."""
+    report = json.dumps(run(path, repeat, warmup, only), indent=2)
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        click.echo(report)
+
+
+if __name__ == '__main__':
+    main()
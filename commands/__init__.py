@@ -0,0 +1,15 @@
+from commands.archive import archive_cli
+from commands.catalog import catalog_cli
+from commands.dashboard import dashboard_cli
+from commands.images import images_cli
+from commands.invoices import invoices_cli
+from commands.stock import stock_cli
+
+
+def register_commands(app):
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(dashboard_cli)
+    app.cli.add_command(images_cli)
+    app.cli.add_command(invoices_cli)
+    app.cli.add_command(stock_cli)
@@ -0,0 +1,30 @@
+import os
+
+import click
+from flask.cli import AppGroup
+
+from extensions import db
+from services.archive import archive_closed_months, archive_cutoff, archive_path, archived_years
+from utils.dates import day_to_date
+
+archive_cli = AppGroup('archive', help='Move old invoices into per-year archive databases.')
+
+
+@archive_cli.command('run')
+@click.option('--keep-months', type=int, default=None,
+              help='Full months to keep in the main database (default ARCHIVE_KEEP_MONTHS).')
+def archive_run(keep_months):
+    """Archive invoices and their lines from before the cutoff month."""
+    click.echo(f'archiving invoices before {day_to_date(archive_cutoff(keep_months))}')
+    moved = archive_closed_months(db.engine, keep_months)
+    for year, count in sorted(moved.items()):
+        click.echo(f'{year}: {count} invoices -> {archive_path(year)}')
+    click.echo(f'{sum(moved.values())} invoices archived')
+
+
+@archive_cli.command('list')
+def archive_list():
+    """Show the archive files reports will attach."""
+    for year in archived_years():
+        path = archive_path(year)
+        click.echo(f'{year}: {path} ({os.path.getsize(path) // 1024} KiB)')
@@ -0,0 +1,44 @@
+import time
+
+import click
+from flask.cli import AppGroup
+
+from extensions import db
+from services.catalog import (CATEGORY_FIELDS, FORMATS, PRODUCT_FIELDS, detect_format, export_catalog,
+                              import_catalog, read_records, write_records)
+
+catalog_cli = AppGroup('catalog', help='Bulk import/export of categories and products.')
+
+KINDS = ('products', 'categories')
+
+
+@catalog_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--kind', type=click.Choice(KINDS), default='products', show_default=True)
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None,
+              help='Default: from the file extension (.csv, .jsonl), else csv.')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=5000, show_default=True,
+              help='Rows per transaction.')
+def catalog_import(source, kind, fmt, chunk_size):
+    """Upsert SOURCE (a file or - for stdin): products by SKU, or by name when they have none."""
+    fmt = fmt or detect_format(source.name)
+    started = time.perf_counter()
+    stats = import_catalog(db.session, read_records(source, fmt), kind, chunk_size,
+                           on_error=lambda e: click.echo(f'not applied {e}', err=True))
+    elapsed = time.perf_counter() - started
+    rows = stats['inserted'] + stats['updated'] + stats['unchanged']
+    click.echo(f"{stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged, "
+               f"{stats['skipped']} skipped, {stats['rejected']} stock changes rejected "
+               f"in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+
+
+@catalog_cli.command('export')
+@click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--kind', type=click.Choice(KINDS), default='products', show_default=True)
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None,
+              help='Default: from the file extension (.csv, .jsonl), else csv.')
+def catalog_export(target, kind, fmt):
+    """Write the catalog to TARGET (default stdout) in the import format."""
+    fmt = fmt or detect_format(target.name)
+    fields = PRODUCT_FIELDS if kind == 'products' else CATEGORY_FIELDS
+    write_records(target, fmt, fields, export_catalog(db.session, kind))
@@ -0,0 +1,35 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+from extensions import db
+from services.dashboard import TOTALS_SQL, rebuild_dashboard
+
+dashboard_cli = AppGroup('dashboard', help='Maintain the trigger-kept dashboard totals.')
+
+
+@dashboard_cli.command('rebuild')
+@click.option('--low-stock', type=int, default=None,
+              help='Count products at or below this stock as low (default LOW_STOCK_THRESHOLD).')
+def dashboard_rebuild(low_stock):
+    """Recount dashboard_totals, daily_sales and daily_cashier from the base tables."""
+    if low_stock is None:
+        low_stock = current_app.config['LOW_STOCK_THRESHOLD']
+    totals = rebuild_dashboard(db.session, low_stock)
+    db.session.commit()
+    click.echo(f"{totals['products']} products, {totals['low_stock']} at or below {low_stock} in stock")
+
+
+@dashboard_cli.command('verify')
+def dashboard_verify():
+    """List totals that disagree with a full recount."""
+    kept = db.session.execute(text("SELECT * FROM dashboard_totals WHERE id = 1")).fetchone()
+    if kept is None:
+        raise click.ClickException('dashboard_totals is empty; run `flask dashboard rebuild`')
+    kept = dict(kept._mapping)
+    counted = dict(db.session.execute(text(TOTALS_SQL), {'threshold': kept['low_stock_threshold']}).fetchone()._mapping)
+    mismatches = [name for name, value in counted.items() if kept[name] != value]
+    for name in mismatches:
+        click.echo(f'{name}: kept {kept[name]}, counted {counted[name]}')
+    click.echo(f'{len(mismatches)} mismatched totals')
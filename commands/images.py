@@ -0,0 +1,21 @@
+import click
+from flask.cli import AppGroup
+
+from extensions import db
+from utils.image_gc import collect_orphaned_images
+
+images_cli = AppGroup('images', help='Manage uploaded images.')
+
+
+@images_cli.command('gc')
+@click.option('--grace', 'grace_seconds', type=int, default=None,
+              help='Keep unreferenced files younger than this many seconds.')
+@click.option('--dry-run', is_flag=True, help='Report what would be removed without deleting.')
+def images_gc(grace_seconds, dry_run):
+    """Remove images no product or user references."""
+    report = collect_orphaned_images(db.session, grace_seconds, dry_run)
+    for name in report['files']:
+        click.echo(('would remove ' if dry_run else 'removed ') + name)
+    click.echo(f"scanned {report['scanned']} files, "
+               f"{'would reclaim' if dry_run else 'reclaimed'} {report['bytes_reclaimed']} bytes "
+               f"from {report['removed']} files")
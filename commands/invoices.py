@@ -0,0 +1,34 @@
+import click
+from flask.cli import AppGroup
+
+from extensions import db
+from services.invoice_export import FORMATS, encode_rows, export_range, export_rows
+from utils.compression import compress_chunks
+
+invoices_cli = AppGroup('invoices', help='Invoice exports for accounting.')
+
+
+@invoices_cli.command('export')
+@click.argument('target', type=click.File('wb'), default='-')
+@click.option('--start', help='First sale date, YYYY-MM-DD (default: the beginning).')
+@click.option('--end', help='Last sale date, YYYY-MM-DD (default: today).')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None,
+              help='Default: from the file extension (.csv, .jsonl, optionally .gz), else csv.')
+@click.option('--after-id', type=int, default=None, help='Resume after this invoice id.')
+@click.option('--gzip/--no-gzip', 'compress', default=None, help='Default: when TARGET ends in .gz.')
+def invoices_export(target, start, end, fmt, after_id, compress):
+    """Stream invoices joined with their lines to TARGET (default stdout)."""
+    name = target.name if isinstance(target.name, str) else ''
+    if compress is None:
+        compress = name.endswith('.gz')
+    if fmt is None:
+        fmt = 'jsonl' if name.removesuffix('.gz').endswith(('.jsonl', '.ndjson')) else 'csv'
+    try:
+        start_day, end_day = export_range(start, end)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    chunks = encode_rows(export_rows(db.session, start_day, end_day, after_id), fmt)
+    if compress:
+        chunks = compress_chunks('gzip', chunks, 6)
+    for chunk in chunks:
+        target.write(chunk)
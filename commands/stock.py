@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from extensions import db
+from services.stock import compact_stock_ledger, stock_mismatches
+
+stock_cli = AppGroup('stock', help='Maintain the stock movement ledger.')
+
+
+@stock_cli.command('compact')
+@click.option('--older-than-days', type=int, default=None,
+              help='Fold movements older than this into the snapshot (default STOCK_COMPACT_AGE_DAYS).')
+def stock_compact(older_than_days):
+    """Fold old ledger rows into stock_snapshot."""
+    if older_than_days is None:
+        older_than_days = current_app.config['STOCK_COMPACT_AGE_DAYS']
+    removed = compact_stock_ledger(db.session, datetime.now() - timedelta(days=older_than_days))
+    click.echo(f'compacted {removed} stock movements')
+
+
+@stock_cli.command('verify')
+def stock_verify():
+    """List products whose stock disagrees with snapshot + ledger."""
+    mismatches = stock_mismatches(db.session)
+    for row in mismatches:
+        click.echo(f"product {row['id']}: stock {row['stock']}, ledger {row['ledger_stock']}")
+    click.echo(f'{len(mismatches)} mismatched products')
@@ -0,0 +1,9 @@
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+from flask_sqlalchemy import SQLAlchemy
+
+from utils.database import RoutingSession
+
+cors = CORS()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+jwt = JWTManager()
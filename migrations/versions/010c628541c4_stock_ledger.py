@@ -0,0 +1,53 @@
+"""stock ledger
+
+Revision ID: 010c628541c4
+Revises: 16fd2e6480f8
+Create Date: 2026-10-19 02:20:25.453852
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010c628541c4'
+down_revision = '16fd2e6480f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_movement',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('qty', sa.Integer(), nullable=False),
+    sa.Column('invoice_detail_id', sa.Integer(), nullable=True),
+    sa.Column('create_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_movement', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stock_movement_product_id'), ['product_id'], unique=False)
+
+    op.create_table('stock_snapshot',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('qty', sa.Integer(), nullable=False),
+    sa.Column('last_movement_id', sa.Integer(), nullable=False),
+    sa.Column('create_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    # Opening balance: today's stock becomes the snapshot the ledger builds on
+    op.execute("""
+        INSERT INTO stock_snapshot (product_id, qty, last_movement_id, create_at)
+        SELECT id, COALESCE(stock, 0), 0, CURRENT_TIMESTAMP FROM product
+    """)
+
+
+def downgrade():
+    op.drop_table('stock_snapshot')
+    with op.batch_alter_table('stock_movement', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stock_movement_product_id'))
+
+    op.drop_table('stock_movement')
@@ -0,0 +1,34 @@
+"""invoice line totals
+
+Revision ID: 1274056cd1d4
+Revises: 010c628541c4
+Create Date: 2026-10-19 02:22:20.560022
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1274056cd1d4'
+down_revision = '010c628541c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('line_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # From now on the server owns the total: rebuild it from the lines once
+    op.execute("""
+        UPDATE invoice
+        SET total_amount = COALESCE((SELECT SUM(d.subtotal) FROM invoice_detail AS d
+                                     WHERE d.invoice_id = invoice.id), 0),
+            line_count = (SELECT COUNT(*) FROM invoice_detail AS d WHERE d.invoice_id = invoice.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.drop_column('line_count')
@@ -0,0 +1,74 @@
+"""product sku
+
+Revision ID: 16fd2e6480f8
+Revises: 61ced00d016c
+Create Date: 2026-10-19 02:19:06.573369
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '16fd2e6480f8'
+down_revision = '61ced00d016c'
+branch_labels = None
+depends_on = None
+
+
+# Dropping sku recreates `product` (SQLite batch mode), and the rename back fails while the
+# full-text triggers from 61ced00d016c point at it: drop them first, recreate them after
+FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_au AFTER UPDATE OF name, description, category_id ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_ad AFTER DELETE ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER category_fts_au AFTER UPDATE OF name ON category BEGIN
+        UPDATE product_fts SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM product WHERE category_id = new.id);
+    END
+    """,
+)
+
+
+def _drop_fts_triggers():
+    if op.get_bind().dialect.name == 'sqlite':
+        for name in ('category_fts_au', 'product_fts_ad', 'product_fts_au', 'product_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _restore_fts_triggers():
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in FTS_TRIGGERS:
+            op.execute(trigger)
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sku', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_product_sku'), ['sku'], unique=True)
+
+
+def downgrade():
+    _drop_fts_triggers()
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_sku'))
+        batch_op.drop_column('sku')
+    _restore_fts_triggers()
@@ -0,0 +1,94 @@
+"""money in cents
+
+Revision ID: 43add010cde9
+Revises: 8de13799aa70
+Create Date: 2026-10-19 05:41:09.318260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '43add010cde9'
+down_revision = '8de13799aa70'
+branch_labels = None
+depends_on = None
+
+
+MONEY_COLUMNS = {
+    'product': ('price',),
+    'invoice': ('total_amount',),
+    'invoice_detail': ('price', 'subtotal'),
+    'price_override': ('list_price', 'price'),
+    'sales_report': ('total_sales',),
+}
+
+NULLABLE = {('price_override', 'list_price'): False, ('price_override', 'price'): False,
+            ('sales_report', 'total_sales'): False}
+
+# Recreating `product` (SQLite batch mode) drops the full-text triggers defined on it, and
+# the rename back fails while category_fts_au points at a missing table: drop all, recreate all
+FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_au AFTER UPDATE OF name, description, category_id ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_ad AFTER DELETE ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER category_fts_au AFTER UPDATE OF name ON category BEGIN
+        UPDATE product_fts SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM product WHERE category_id = new.id);
+    END
+    """,
+)
+
+
+def _drop_fts_triggers():
+    if op.get_bind().dialect.name == 'sqlite':
+        for name in ('category_fts_au', 'product_fts_ad', 'product_fts_au', 'product_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _restore_fts_triggers():
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in FTS_TRIGGERS:
+            op.execute(trigger)
+
+
+def upgrade():
+    _drop_fts_triggers()
+    for table, columns in MONEY_COLUMNS.items():
+        # Scale first: the batch copy casts to INTEGER and would truncate 12.5 to 12
+        op.execute(f"UPDATE {table} SET " + ', '.join(f"{c} = ROUND({c} * 100)" for c in columns))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.Float(), type_=sa.Integer(),
+                                      existing_nullable=NULLABLE.get((table, column), True))
+    _restore_fts_triggers()
+
+
+def downgrade():
+    _drop_fts_triggers()
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.Integer(), type_=sa.Float(),
+                                      existing_nullable=NULLABLE.get((table, column), True))
+        op.execute(f"UPDATE {table} SET " + ', '.join(f"{c} = {c} / 100.0" for c in columns))
+    _restore_fts_triggers()
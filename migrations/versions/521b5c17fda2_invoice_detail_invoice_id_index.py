@@ -0,0 +1,26 @@
+"""invoice_detail invoice_id index
+
+Revision ID: 521b5c17fda2
+Revises: 1274056cd1d4
+Create Date: 2026-10-19 04:12:31.208114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '521b5c17fda2'
+down_revision = '1274056cd1d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('invoice_detail', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_invoice_detail_invoice_id'), ['invoice_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('invoice_detail', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_invoice_detail_invoice_id'))
@@ -0,0 +1,75 @@
+"""product full text search
+
+Revision ID: 61ced00d016c
+Revises: ef7bbb838ed7
+Create Date: 2026-10-19 02:18:16.075073
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '61ced00d016c'
+down_revision = 'ef7bbb838ed7'
+branch_labels = None
+depends_on = None
+
+
+TRIGGERS = (
+    """
+    CREATE TRIGGER product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_au AFTER UPDATE OF name, description, category_id ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_ad AFTER DELETE ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER category_fts_au AFTER UPDATE OF name ON category BEGIN
+        UPDATE product_fts SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM product WHERE category_id = new.id);
+    END
+    """,
+)
+
+
+def upgrade():
+    # FTS5 is SQLite only; other databases fall back to LIKE in the search route
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("""
+        CREATE VIRTUAL TABLE product_fts USING fts5(
+            name, description, category_name,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    op.execute("""
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        SELECT p.id, p.name, p.description, c.name
+        FROM product AS p
+        LEFT JOIN category AS c ON p.category_id = c.id
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for name in ('category_fts_au', 'product_fts_ad', 'product_fts_au', 'product_fts_ai'):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS product_fts")
@@ -0,0 +1,46 @@
+"""sale day
+
+Revision ID: 80693a631a97
+Revises: 43add010cde9
+Create Date: 2026-10-19 06:20:54.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '80693a631a97'
+down_revision = '43add010cde9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sale_day', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_invoice_sale_day_user_id', ['sale_day', 'user_id'], unique=False)
+
+    with op.batch_alter_table('invoice_detail', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sale_day', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_invoice_detail_sale_day_product_id', ['sale_day', 'product_id'], unique=False)
+
+    # create_at holds both '2024-05-01' strings and datetimes; both reduce to a day number
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("UPDATE invoice SET sale_day = CAST(julianday(date(create_at)) - 2440587.5 AS INTEGER)")
+    else:
+        op.execute("UPDATE invoice SET sale_day = CAST(create_at AS DATE) - DATE '1970-01-01'")
+    op.execute("""
+        UPDATE invoice_detail
+        SET sale_day = (SELECT sale_day FROM invoice WHERE invoice.id = invoice_detail.invoice_id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('invoice_detail', schema=None) as batch_op:
+        batch_op.drop_index('ix_invoice_detail_sale_day_product_id')
+        batch_op.drop_column('sale_day')
+
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.drop_index('ix_invoice_sale_day_user_id')
+        batch_op.drop_column('sale_day')
@@ -0,0 +1,39 @@
+"""price override
+
+Revision ID: 8de13799aa70
+Revises: 521b5c17fda2
+Create Date: 2026-10-19 05:03:47.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8de13799aa70'
+down_revision = '521b5c17fda2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('price_override',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('invoice_detail_id', sa.Integer(), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('list_price', sa.Float(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('reason', sa.String(length=255), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('create_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('price_override', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_price_override_invoice_detail_id'), ['invoice_detail_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('price_override', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_price_override_invoice_detail_id'))
+
+    op.drop_table('price_override')
@@ -0,0 +1,189 @@
+"""dashboard totals
+
+Revision ID: 95f263477548
+Revises: 80693a631a97
+Create Date: 2026-10-19 06:12:40.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '95f263477548'
+down_revision = '80693a631a97'
+branch_labels = None
+depends_on = None
+
+
+# Relative updates of the summary rows on every write, so reading the dashboard
+# never scans product or invoice. low_stock compares against the threshold stored
+# in the totals row (`flask dashboard rebuild --low-stock N` changes it).
+TRIGGERS = (
+    """
+    CREATE TRIGGER product_totals_ai AFTER INSERT ON product BEGIN
+        UPDATE dashboard_totals
+        SET products = products + 1,
+            stock = stock + COALESCE(new.stock, 0),
+            stock_value = stock_value + COALESCE(new.price, 0) * COALESCE(new.stock, 0),
+            low_stock = low_stock + (COALESCE(new.stock, 0) <= low_stock_threshold)
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER product_totals_au AFTER UPDATE OF price, stock ON product BEGIN
+        UPDATE dashboard_totals
+        SET stock = stock + COALESCE(new.stock, 0) - COALESCE(old.stock, 0),
+            stock_value = stock_value + COALESCE(new.price, 0) * COALESCE(new.stock, 0)
+                                      - COALESCE(old.price, 0) * COALESCE(old.stock, 0),
+            low_stock = low_stock + (COALESCE(new.stock, 0) <= low_stock_threshold)
+                                  - (COALESCE(old.stock, 0) <= low_stock_threshold)
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER product_totals_ad AFTER DELETE ON product BEGIN
+        UPDATE dashboard_totals
+        SET products = products - 1,
+            stock = stock - COALESCE(old.stock, 0),
+            stock_value = stock_value - COALESCE(old.price, 0) * COALESCE(old.stock, 0),
+            low_stock = low_stock - (COALESCE(old.stock, 0) <= low_stock_threshold)
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER category_totals_ai AFTER INSERT ON category BEGIN
+        UPDATE dashboard_totals SET categories = categories + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER category_totals_ad AFTER DELETE ON category BEGIN
+        UPDATE dashboard_totals SET categories = categories - 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER user_totals_ai AFTER INSERT ON user BEGIN
+        UPDATE dashboard_totals SET users = users + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER user_totals_ad AFTER DELETE ON user BEGIN
+        UPDATE dashboard_totals SET users = users - 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER invoice_daily_ai AFTER INSERT ON invoice WHEN new.sale_day IS NOT NULL BEGIN
+        INSERT INTO daily_sales (sale_day, total, invoices)
+        VALUES (new.sale_day, COALESCE(new.total_amount, 0), 1)
+        ON CONFLICT (sale_day) DO UPDATE SET total = total + excluded.total, invoices = invoices + 1;
+        INSERT INTO daily_cashier (sale_day, user_id, invoices)
+        VALUES (new.sale_day, new.user_id, 1)
+        ON CONFLICT (sale_day, user_id) DO UPDATE SET invoices = invoices + 1;
+    END
+    """,
+    # Every invoice line changes total_amount: keep that path to one primary key update
+    """
+    CREATE TRIGGER invoice_daily_total_au AFTER UPDATE OF total_amount ON invoice
+    WHEN old.sale_day IS new.sale_day AND old.user_id IS new.user_id BEGIN
+        UPDATE daily_sales
+        SET total = total + COALESCE(new.total_amount, 0) - COALESCE(old.total_amount, 0)
+        WHERE sale_day = new.sale_day;
+    END
+    """,
+    """
+    CREATE TRIGGER invoice_daily_move_au AFTER UPDATE OF sale_day, user_id ON invoice
+    WHEN old.sale_day IS NOT new.sale_day OR old.user_id IS NOT new.user_id BEGIN
+        UPDATE daily_sales
+        SET total = total - COALESCE(old.total_amount, 0), invoices = invoices - 1
+        WHERE sale_day = old.sale_day;
+        UPDATE daily_cashier SET invoices = invoices - 1
+        WHERE sale_day = old.sale_day AND user_id = old.user_id;
+        DELETE FROM daily_cashier
+        WHERE sale_day = old.sale_day AND user_id = old.user_id AND invoices <= 0;
+        INSERT INTO daily_sales (sale_day, total, invoices)
+        SELECT new.sale_day, COALESCE(new.total_amount, 0), 1 WHERE new.sale_day IS NOT NULL
+        ON CONFLICT (sale_day) DO UPDATE SET total = total + excluded.total, invoices = invoices + 1;
+        INSERT INTO daily_cashier (sale_day, user_id, invoices)
+        SELECT new.sale_day, new.user_id, 1 WHERE new.sale_day IS NOT NULL
+        ON CONFLICT (sale_day, user_id) DO UPDATE SET invoices = invoices + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER invoice_daily_ad AFTER DELETE ON invoice WHEN old.sale_day IS NOT NULL BEGIN
+        UPDATE daily_sales
+        SET total = total - COALESCE(old.total_amount, 0), invoices = invoices - 1
+        WHERE sale_day = old.sale_day;
+        UPDATE daily_cashier SET invoices = invoices - 1
+        WHERE sale_day = old.sale_day AND user_id = old.user_id;
+        DELETE FROM daily_cashier
+        WHERE sale_day = old.sale_day AND user_id = old.user_id AND invoices <= 0;
+    END
+    """,
+)
+TRIGGER_NAMES = (
+    'invoice_daily_ad', 'invoice_daily_move_au', 'invoice_daily_total_au', 'invoice_daily_ai',
+    'user_totals_ad', 'user_totals_ai', 'category_totals_ad', 'category_totals_ai',
+    'product_totals_ad', 'product_totals_au', 'product_totals_ai',
+)
+
+
+def upgrade():
+    op.create_table('dashboard_totals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('products', sa.Integer(), nullable=False),
+    sa.Column('categories', sa.Integer(), nullable=False),
+    sa.Column('users', sa.Integer(), nullable=False),
+    sa.Column('stock', sa.Integer(), nullable=False),
+    sa.Column('stock_value', sa.Integer(), nullable=False),
+    sa.Column('low_stock', sa.Integer(), nullable=False),
+    sa.Column('low_stock_threshold', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('daily_sales',
+    sa.Column('sale_day', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('invoices', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('sale_day')
+    )
+    op.create_table('daily_cashier',
+    sa.Column('sale_day', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('invoices', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('sale_day', 'user_id')
+    )
+    # Triggers are SQLite only; on other databases services.dashboard aggregates live
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    op.execute("""
+        INSERT INTO dashboard_totals (id, products, categories, users, stock, stock_value, low_stock,
+                                      low_stock_threshold)
+        SELECT 1,
+               (SELECT COUNT(*) FROM product),
+               (SELECT COUNT(*) FROM category),
+               (SELECT COUNT(*) FROM user),
+               (SELECT COALESCE(SUM(stock), 0) FROM product),
+               (SELECT COALESCE(SUM(COALESCE(price, 0) * stock), 0) FROM product),
+               (SELECT COUNT(*) FROM product WHERE COALESCE(stock, 0) <= 5),
+               5
+    """)
+    op.execute("""
+        INSERT INTO daily_sales (sale_day, total, invoices)
+        SELECT sale_day, COALESCE(SUM(total_amount), 0), COUNT(*)
+        FROM invoice WHERE sale_day IS NOT NULL GROUP BY sale_day
+    """)
+    op.execute("""
+        INSERT INTO daily_cashier (sale_day, user_id, invoices)
+        SELECT sale_day, user_id, COUNT(*)
+        FROM invoice WHERE sale_day IS NOT NULL GROUP BY sale_day, user_id
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for name in TRIGGER_NAMES:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('daily_cashier')
+    op.drop_table('daily_sales')
+    op.drop_table('dashboard_totals')
@@ -4,3 +4,6 @@ from model.product import *
 from model.invoice import *
 from model.invoice_detail import *
 from model.reporting import *
+from model.stock_movement import *
+from model.price_override import *
+from model.dashboard import *
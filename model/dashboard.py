@@ -0,0 +1,27 @@
+from extensions import db
+
+
+class DashboardTotals(db.Model):
+    """Single row (id 1) of catalog totals kept current by SQLite triggers on every write."""
+    id = db.Column(db.Integer, primary_key=True)
+    products = db.Column(db.Integer, nullable=False, default=0)
+    categories = db.Column(db.Integer, nullable=False, default=0)
+    users = db.Column(db.Integer, nullable=False, default=0)
+    stock = db.Column(db.Integer, nullable=False, default=0)
+    stock_value = db.Column(db.Integer, nullable=False, default=0)  # cents, SUM(price * stock)
+    low_stock = db.Column(db.Integer, nullable=False, default=0)  # products with stock <= threshold
+    low_stock_threshold = db.Column(db.Integer, nullable=False, default=5)
+
+
+class DailySales(db.Model):
+    """Per sale_day invoice count and total of the hot invoice table, trigger maintained."""
+    sale_day = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    total = db.Column(db.Integer, nullable=False, default=0)  # cents
+    invoices = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyCashier(db.Model):
+    """Invoices per cashier per day; a row exists only while the count is positive."""
+    sale_day = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    invoices = db.Column(db.Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from app import db
+from extensions import db
 
 
 class Invoice(db.Model):
@@ -8,6 +8,10 @@ class Invoice(db.Model):
     customer_name = db.Column(db.String(128))
     customer_phone = db.Column(db.String(128))
     create_at =db.Column(db.Date)
-    total_amount = db.Column(db.Float)
+    sale_day = db.Column(db.Integer)  # days since 1970-01-01, see utils.dates
+    total_amount = db.Column(db.Integer)  # cents, maintained from the lines, see services.invoice_totals
+    line_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     payment_method = db.Column(db.String(255))
-    remark = db.Column(db.String(255))
\ No newline at end of file
+    remark = db.Column(db.String(255))
+
+    __table_args__ = (db.Index('ix_invoice_sale_day_user_id', 'sale_day', 'user_id'),)
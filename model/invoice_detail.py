@@ -1,13 +1,16 @@
-from app import db
+from extensions import db
 
 class InvoiceDetail(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id'), nullable=False)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id'), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     qty = db.Column(db.Integer)
-    price = db.Column(db.Float)
-    subtotal = db.Column(db.Float)
+    price = db.Column(db.Integer)  # cents
+    subtotal = db.Column(db.Integer)  # cents
     create_at = db.Column(db.DateTime)
+    sale_day = db.Column(db.Integer)  # copied from the invoice, so line reports skip the join
+
+    __table_args__ = (db.Index('ix_invoice_detail_sale_day_product_id', 'sale_day', 'product_id'),)
 
 
 
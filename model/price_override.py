@@ -0,0 +1,12 @@
+from extensions import db
+
+class PriceOverride(db.Model):
+    """Audit row for an invoice line charged at something other than the list price."""
+    id = db.Column(db.Integer, primary_key=True)
+    invoice_detail_id = db.Column(db.Integer, nullable=True, index=True)
+    product_id = db.Column(db.Integer, nullable=False)  # no FK: the audit outlives the product
+    list_price = db.Column(db.Integer, nullable=False)  # cents
+    price = db.Column(db.Integer, nullable=False)  # cents
+    reason = db.Column(db.String(255))
+    user_id = db.Column(db.Integer, nullable=True)
+    create_at = db.Column(db.DateTime)
@@ -1,11 +1,12 @@
-from app import db
+from extensions import db
 
 class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
     name = db.Column(db.String(128))
+    sku = db.Column(db.String(64), unique=True, index=True)  # barcode / scanner code
     stock = db.Column(db.Integer)
-    price =db.Column(db.Float)
+    price = db.Column(db.Integer)  # cents, see utils.money
     description = db.Column(db.String(255))
     image = db.Column(db.String(255))
     create_at = db.Column(db.Date)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from extensions import db
+
+class StockMovement(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # sale, return, adjustment, receipt
+    qty = db.Column(db.Integer, nullable=False)  # signed change to product.stock
+    invoice_detail_id = db.Column(db.Integer, nullable=True)
+    create_at = db.Column(db.DateTime)
+
+
+class StockSnapshot(db.Model):
+    """Movements folded away by compaction: stock = snapshot.qty + SUM(remaining movements)."""
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), primary_key=True)
+    qty = db.Column(db.Integer, nullable=False)
+    last_movement_id = db.Column(db.Integer, nullable=False)
+    create_at = db.Column(db.DateTime)
@@ -1,8 +1,54 @@
-from routes.user import *
-from routes.errors import *
-from routes.category import *
-from routes.product import *
-from routes.invoice import *
-from routes.invoice_detail import *
-from routes.salereport import *
-from routes.auth import *
\ No newline at end of file
+import importlib
+import threading
+
+# Blueprint name -> module defining ``bp``. Modules are only imported when registered.
+BLUEPRINTS = {
+    'errors': 'routes.errors',
+    'assets': 'routes.static_files',
+    'auth': 'routes.auth',
+    'user': 'routes.user',
+    'category': 'routes.category',
+    'product': 'routes.product',
+    'invoice': 'routes.invoice',
+    'invoice_detail': 'routes.invoice_detail',
+    'salereport': 'routes.salereport',
+    'stock': 'routes.stock',
+    'dashboard': 'routes.dashboard',
+    'metrics': 'routes.metrics',
+    'admin': 'routes.admin',
+}
+
+
+def register_blueprints(app, names=None):
+    names = list(names or BLUEPRINTS)
+    if 'errors' not in names:
+        names.insert(0, 'errors')  # JSON error bodies for every subset
+    for name in names:
+        if name not in BLUEPRINTS:
+            raise ValueError(f'Unknown blueprint {name!r}')
+        module = importlib.import_module(BLUEPRINTS[name])
+        app.register_blueprint(module.bp)
+
+
+class LazyBlueprints:
+    """WSGI wrapper that imports and registers the route modules on the first request.
+
+    Keeps create_app() cheap for CLI commands, preloading masters and tests that
+    never dispatch a request.
+    """
+
+    def __init__(self, app, names=None):
+        self.app = app
+        self.names = names
+        self.wsgi_app = app.wsgi_app
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def __call__(self, environ, start_response):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    register_blueprints(self.app, self.names)
+                    self.app.wsgi_app = self.wsgi_app
+                    self.loaded = True
+        return self.wsgi_app(environ, start_response)
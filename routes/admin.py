@@ -0,0 +1,32 @@
+from functools import wraps
+
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt, jwt_required
+
+from utils.slow_queries import clear_slow_queries, slow_query_report
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+def admin_required(fn):
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if get_jwt().get('role') != 'admin':
+            return jsonify({'error': 'Admin role required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+# Per worker process, like /metrics
+@bp.get('/slow-queries')
+@admin_required
+def slow_queries():
+    return jsonify(slow_query_report())
+
+
+@bp.delete('/slow-queries')
+@admin_required
+def reset_slow_queries():
+    clear_slow_queries()
+    return '', 204
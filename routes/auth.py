@@ -3,9 +3,12 @@ from urllib.parse import uses_relative
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from app import app, create_access_token, db
-from flask import request, jsonify
+from extensions import db
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import create_access_token
 from model import User
+
+bp = Blueprint('auth', __name__)
 jwt_blocklist = set()
 
 def check_if_token_revoked(jwt_header, jwt_payload):
@@ -15,7 +18,7 @@ def check_if_token_revoked(jwt_header, jwt_payload):
 
 
 # Register
-@app.post("/register")
+@bp.post("/register")
 def register():
     data = request.get_json(silent=True) or {}
     name = (data.get("name") or "").strip()
@@ -35,7 +38,7 @@ def register():
     db.session.add(user)
     db.session.commit()
     return jsonify({"msg": "User registered successfully"}), 201
-@app.post("/login")
+@bp.post("/login")
 def login():
     data = request.get_json(silent=True) or {}
     username = (data.get("name") or "").strip()
@@ -61,7 +64,7 @@ def login():
             return jsonify({"Message": "Bad username or password"}), 401
 
 # Logout
-@app.post("/logout")
+@bp.post("/logout")
 @jwt_required()
 def logout():
     jti = get_jwt()["jti"]
@@ -69,7 +72,7 @@ def logout():
     return jsonify({"msg": "Successfully logged out"}), 200
 
 
-@app.get("/me")
+@bp.get("/me")
 @jwt_required()
 def me():
     user_id = get_jwt_identity()
@@ -84,7 +87,7 @@ def me():
     )
 
 # Reset password (Authenticated)
-@app.post("/reset-password")
+@bp.post("/reset-password")
 @jwt_required()
 def reset_password():
     user_id = get_jwt_identity()
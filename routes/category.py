@@ -2,35 +2,56 @@ from datetime import datetime
 
 from unicodedata import category
 
-from app import app, db
-from flask import jsonify, request
+from extensions import db
+from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 from werkzeug.utils import secure_filename
 import os
 import uuid
 
 from model import Category
+from services.product_codes import invalidate_product_codes
+from utils.fields import FieldError, field_error, requested_fields, select_list
 
+bp = Blueprint('category', __name__)
 
-@app.get('/api/category')
+
+CATEGORY_COLUMNS = {
+    'id': 'id',
+    'name': 'UPPER(name)',
+    'active': "'true'",
+    'create_at': 'create_at',
+}
+CATEGORY_TYPES = {'create_at': db.Date}
+
+
+def list_categories():
+    fields = requested_fields(CATEGORY_COLUMNS)
+    sql = text(f"SELECT {select_list(CATEGORY_COLUMNS, fields)} FROM category").columns(**CATEGORY_TYPES)
+    return [dict(row._mapping) for row in db.session.execute(sql)]
+
+
+@bp.get('/api/category')
 def get_category():
-    sql = text("SELECT id, UPPER(name) as name , 'true' as active,create_at FROM category")
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_categories()
+    except FieldError as e:
+        return field_error(e)
     if not rows:
         return jsonify({'message': 'No category found'})
     return jsonify(rows)
 
-@app.get('/api/category/list')
+@bp.get('/api/category/list')
 def get_all_category():
-    sql = text("SELECT id, UPPER(name) as name , 'true' as active,create_at FROM category")
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_categories()
+    except FieldError as e:
+        return field_error(e)
     if not rows:
         return jsonify({'message': 'No category found'})
     return jsonify(rows)
 
-@app.get('/api/category/list/<int:id>')
+@bp.get('/api/category/list/<int:id>')
 def get_category_by_id(id):
     category = Category.query.get_or_404(id)
     return jsonify({
@@ -42,13 +63,13 @@ def get_category_by_id(id):
 
 
 def sql_fetch(category_id: int):
-    sql = text("SELECT id, UPPER(name) as name, create_at FROM category WHERE id = :id")
+    sql = text("SELECT id, UPPER(name) as name, create_at FROM category WHERE id = :id").columns(**CATEGORY_TYPES)
     result = db.session.execute(sql, {"id": category_id}).fetchone()
     if not result:
         return None
     return dict(result._mapping)
 
-@app.post('/api/category/create')
+@bp.post('/api/category/create')
 def add_category():
     data = request.get_json()
     if 'name' not in data:
@@ -70,7 +91,7 @@ def add_category():
     })
 
 
-@app.put('/api/category/update')
+@bp.put('/api/category/update')
 def update_category():
     data = request.get_json()
     category_id = data.get('category_id')
@@ -90,15 +111,15 @@ def update_category():
         return jsonify({'error': "Missing key 'name' in request"})
     create_at = datetime.now()
     formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
     category.name = new_name
     category.created_at = formatted_date
     db.session.commit()
+    invalidate_product_codes()
     category_info = {
         'id': category_id,
         'name': category.name,
         'active': "true",
-        'create_at': display_date,
+        'create_at': create_at.date(),
 
     }
     return jsonify({
@@ -107,7 +128,7 @@ def update_category():
     })
 
 
-@app.delete('/api/category/delete')
+@bp.delete('/api/category/delete')
 def delete_category():
     data = request.get_json()
     category_id = data.get('category_id')
@@ -115,14 +136,14 @@ def delete_category():
         return jsonify({'error': 'Category ID is required'})
     category = Category.query.get_or_404(category_id)
     create_at = datetime.now()
-    display_date = create_at.strftime("%d-%m-%Y")
     db.session.delete(category)
     db.session.commit()
+    invalidate_product_codes()
     category_info = {
         'id': category.id,
         'name': category.name,
         'active': "true",
-        'create_at': display_date,
+        'create_at': create_at.date(),
 
     }
     return jsonify({
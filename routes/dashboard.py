@@ -0,0 +1,11 @@
+from flask import Blueprint, current_app, jsonify
+
+from extensions import db
+from services.dashboard import dashboard_summary
+
+bp = Blueprint('dashboard', __name__)
+
+
+@bp.get('/api/dashboard/summary')
+def get_dashboard_summary():
+    return jsonify(dashboard_summary(db.session, threshold=current_app.config['LOW_STOCK_THRESHOLD']))
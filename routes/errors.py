@@ -1,13 +1,33 @@
-from app import app
+from flask import Blueprint
+from sqlalchemy.exc import OperationalError
 
-@app.errorhandler(404)
+bp = Blueprint('errors', __name__)
+
+@bp.app_errorhandler(404)
 def error_404(e):
     return {
         'Message': 'Page Not Found !'
     },404
 
-@app.errorhandler(500)
-def error_404(e):
+@bp.app_errorhandler(413)
+def error_413(e):
+    return {
+        'Message': 'Upload too large !'
+    },413
+
+@bp.app_errorhandler(500)
+def error_500(e):
     return {
         'Message': 'Oop! Internal Server Error '
     },500
+
+# SQLite gave up waiting for the write lock (SQLITE_BUSY_TIMEOUT_MS): tell the client to retry.
+# Any other OperationalError is a real fault: re-raise it so Flask logs it, sends
+# got_request_exception (metrics) and answers through error_500.
+@bp.app_errorhandler(OperationalError)
+def error_locked(e):
+    if 'database is locked' not in str(e.orig):
+        raise e
+    return {
+        'Message': 'Database busy, try again'
+    },503,{'Retry-After': '1'}
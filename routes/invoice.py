@@ -1,62 +1,169 @@
 import uuid
 from datetime import datetime
 
-from app import app, db
-from flask import jsonify, request
+from extensions import db
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
 from sqlalchemy import text
 from model import Product, Invoice
+from services.invoice_export import FORMATS, encode_rows, export_range, export_rows
+from services.invoice_totals import invoice_total
+from services.stock import return_stock
+from utils.dates import sale_day
+from utils.fields import FieldError, field_error, requested_fields, select_list
+from utils.money import from_cents, money_row, money_rows
 from werkzeug.utils import secure_filename
 import os
 
-@app.get('/api/invoices')
+bp = Blueprint('invoice', __name__)
+
+INVOICE_COLUMNS = {
+    'id': 'i.id',
+    'invoice_number': 'i.invoice_number',
+    'active': "'true'",
+    'customer_name': 'i.customer_name',
+    'customer_phone': 'i.customer_phone',
+    'create_date': 'i.create_at',
+    'total_amount': 'i.total_amount',
+    'line_count': 'i.line_count',
+    'payment_method': 'i.payment_method',
+    'remark': 'i.remark',
+    'user_name': 'u.name',
+}
+INVOICE_TYPES = {'create_date': db.Date}
+
+
+def list_invoices():
+    fields = requested_fields(INVOICE_COLUMNS)
+    sql = text(f"""
+        SELECT {select_list(INVOICE_COLUMNS, fields)}
+        FROM invoice as i
+        JOIN user as u ON i.user_id = u.id
+    """).columns(**INVOICE_TYPES)
+    return money_rows(db.session.execute(sql), 'total_amount')
+
+
+@bp.get('/api/invoices')
 def get_invoices():
-    sql = text("""SELECT i.id, i.invoice_number  , 'true' as active , i.customer_name,i.customer_phone,i.create_at as create_date, 
-                i.total_amount,i.payment_method,i.remark , u.name as user_name FROM invoice as i
-                join user as u
-                on i.user_id = u.id
-    """)
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_invoices()
+    except FieldError as e:
+        return field_error(e)
     if not rows:
         return jsonify({'message': 'No invoices found'})
     return jsonify(rows)
 
-@app.get('/api/invoices/list')
+@bp.get('/api/invoices/list')
 def get_all_invoices():
-    sql = text("""SELECT i.id, i.invoice_number  , 'true' as active , i.customer_name,i.customer_phone,i.create_at as create_date, 
-                i.total_amount,i.payment_method,i.remark , u.name as user_name FROM invoice as i
-                join user as u
-                on i.user_id = u.id
-        """)
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_invoices()
+    except FieldError as e:
+        return field_error(e)
     if not rows:
         return jsonify({'message': 'No invoices found'})
     return jsonify(rows)
 
-@app.get('/api/invoices/list/<int:id>')
+@bp.get('/api/invoices/list/<int:id>')
 def get_invoice_by_id(id):
     sql = text("""SELECT i.id, i.invoice_number  , 'true' as active , i.customer_name,i.customer_phone,i.create_at as create_date, 
-                i.total_amount,i.payment_method,i.remark , u.name as user_name FROM invoice as i
+                i.total_amount,i.line_count,i.payment_method,i.remark , u.name as user_name FROM invoice as i
                 join user as u
                 on i.user_id = u.id
                 WHERE i.id = :id
-                      """)
+                      """).columns(**INVOICE_TYPES)
     result = db.session.execute(sql, {'id': id}).fetchall()
     if not result:
         return jsonify({'error': 'Invoice not found'})
-    rows = [dict(row._mapping) for row in result]
+    rows = money_rows(result, 'total_amount')
     return jsonify(rows)
 
 
-@app.post('/api/invoices/create')
+# Upper bound on ids per /api/invoices/full request
+MAX_FULL_INVOICES = 100
+
+
+def load_full_invoices(ids):
+    """Invoices with their lines nested, in two queries whatever the number of ids.
+
+    Headers (with the cashier name) come from one primary-key lookup; lines and
+    product names from one scan of the invoice_detail.invoice_id index.
+    """
+    params = {f'id{i}': invoice_id for i, invoice_id in enumerate(ids)}
+    in_list = ', '.join(':' + key for key in params)
+    headers = db.session.execute(text(f"""
+        SELECT i.id, i.invoice_number, i.customer_name, i.customer_phone, i.create_at as create_date,
+               i.total_amount, i.line_count, i.payment_method, i.remark, u.name as user_name
+        FROM invoice as i
+        JOIN user as u ON i.user_id = u.id
+        WHERE i.id IN ({in_list})
+    """).columns(**INVOICE_TYPES), params).fetchall()
+    invoices = {row.id: dict(money_row(row, 'total_amount'), lines=[]) for row in headers}
+    if not invoices:
+        return []
+
+    lines = db.session.execute(text(f"""
+        SELECT d.id, d.invoice_id, d.product_id, p.name as product_name, d.qty, d.price, d.subtotal
+        FROM invoice_detail as d
+        LEFT JOIN product as p ON d.product_id = p.id
+        WHERE d.invoice_id IN ({in_list})
+        ORDER BY d.invoice_id, d.id
+    """), params).fetchall()
+    for row in lines:
+        line = money_row(row, 'price', 'subtotal')
+        invoices[line.pop('invoice_id')]['lines'].append(line)
+    # Keep the caller's order
+    return [invoices[invoice_id] for invoice_id in ids if invoice_id in invoices]
+
+
+@bp.get('/api/invoices/<int:id>/full')
+def get_full_invoice(id):
+    invoices = load_full_invoices([id])
+    if not invoices:
+        return jsonify({'error': 'Invoice not found'}), 404
+    return jsonify(invoices[0])
+
+
+@bp.get('/api/invoices/full')
+def get_full_invoices():
+    ids = request.args.get('ids', '')
+    try:
+        invoice_ids = list(dict.fromkeys(int(i) for i in ids.split(',') if i.strip()))
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma-separated list of numbers'}), 400
+    if not invoice_ids:
+        return jsonify({'error': 'No ids provided'}), 400
+    if len(invoice_ids) > MAX_FULL_INVOICES:
+        return jsonify({'error': f'At most {MAX_FULL_INVOICES} ids per request'}), 400
+    return jsonify(load_full_invoices(invoice_ids))
+
+
+# Accounting export: one row per line, streamed in invoice id order
+@bp.get('/api/invoices/export')
+def export_invoices():
+    fmt = request.args.get('format', 'csv')
+    after_id = request.args.get('after_id')
+    if fmt not in FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(FORMATS)}"}), 400
+    if after_id is not None and not after_id.isdigit():
+        return jsonify({'error': 'after_id must be a number'}), 400
+    try:
+        start_day, end_day = export_range(request.args.get('start'), request.args.get('end'))
+    except ValueError:
+        return jsonify({'error': 'start and end must be YYYY-MM-DD dates, start first'}), 400
+
+    chunks = encode_rows(export_rows(db.session, start_day, end_day, after_id and int(after_id)), fmt)
+    # Compressed on the fly by utils.compression when the client accepts it
+    headers = {'Content-Disposition': f'attachment; filename=invoices.{fmt}'}
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return current_app.response_class(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+@bp.post('/api/invoices/create')
 def create_invoices():
     data = request.get_json()
     if not data:
         return jsonify({'error': 'No Invoices provided'})
     customer_name=data.get('customer_name')
     customer_phone=data.get('customer_phone')
-    total_amount=data.get('total_amount')
     payment_method=data.get('payment_method')
     remark=data.get('remark')
     user_id = data.get('user_id')
@@ -65,8 +172,6 @@ def create_invoices():
         return {'error': 'No customer_name provided'}
     if not customer_phone:
         return {'error': 'No customer_phone provided'}
-    if not total_amount:
-        return {'error': 'No total_amount provided'}
     if not user_id:
         return {'error': 'No user_id provided'}
     if not payment_method:
@@ -82,47 +187,45 @@ def create_invoices():
 
     create_at = datetime.now()
     formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
 
     if not str(user_id).isdigit():
         return jsonify({'error': ' user_id must be a number'})
-    try:
-        total_amount = float(total_amount)
-    except (ValueError, TypeError):
-        return jsonify({'error': 'total_amount must be a number'})
 
     sql = text("""
-       INSERT INTO invoice (invoice_number, customer_name, customer_phone, create_at, 
-                             total_amount, payment_method, remark, user_id)
-        VALUES (:invoice_number, :customer_name, :customer_phone, :create_at, 
-                :total_amount, :payment_method, :remark, :user_id)
+       INSERT INTO invoice (invoice_number, customer_name, customer_phone, create_at, sale_day,
+                             total_amount, line_count, payment_method, remark, user_id)
+        VALUES (:invoice_number, :customer_name, :customer_phone, :create_at, :sale_day,
+                0, 0, :payment_method, :remark, :user_id)
     """)
-    db.session.execute(sql, {
+    result = db.session.execute(sql, {
         "invoice_number": invoice_number,
         "customer_name": customer_name,
         "customer_phone": customer_phone,
         "create_at": formatted_date,
-        "total_amount": total_amount,
+        "sale_day": sale_day(create_at),
         "payment_method": payment_method,
         "remark": remark,
         "user_id": user_id
     })
     db.session.commit()
+    total_amount, line_count = 0, 0  # the invoice detail routes maintain these
     return {
         'Message': 'Invoices created successfully',
         'Invoices': {
+            "id": result.lastrowid,
             "invoice_number": invoice_number,
             "customer_name": customer_name,
             "customer_phone": customer_phone,
-            "create_at": display_date,
-            "total_amount": total_amount,
+            "create_at": create_at.date(),
+            "total_amount": from_cents(total_amount),
+            "line_count": line_count,
             "payment_method": payment_method,
             "remark": remark,
             "user_id": user_id
         }
     }
 
-@app.put('/api/invoices/update')
+@bp.put('/api/invoices/update')
 def update_invoices():
     data = request.get_json()
     invoice_id = data.get('invoice_id')
@@ -136,7 +239,6 @@ def update_invoices():
 
     customer_name=data.get('customer_name')
     customer_phone=data.get('customer_phone')
-    total_amount=data.get('total_amount')
     payment_method=data.get('payment_method')
     remark=data.get('remark')
     user_id = data.get('user_id')
@@ -145,8 +247,6 @@ def update_invoices():
         return {'error': 'No customer_name provided'}
     if not customer_phone:
         return {'error': 'No customer_phone provided'}
-    if not total_amount:
-        return {'error': 'No total_amount provided'}
     if not user_id:
         return {'error': 'No user_id provided'}
     if not payment_method:
@@ -155,52 +255,52 @@ def update_invoices():
     invoice_number = invoices.invoice_number
     create_at = datetime.now()
     formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
 
     if not str(user_id).isdigit():
         return jsonify({'error': ' user_id must be a number'})
-    try:
-        total_amount = float(total_amount)
-    except (ValueError, TypeError):
-        return jsonify({'error': 'total_amount must be a number'})
 
     sql = text("""
       UPDATE invoice
         SET customer_name = :customer_name,
             customer_phone = :customer_phone,
-            total_amount = :total_amount,
             payment_method = :payment_method,
             remark = :remark,
             user_id = :user_id,
-            create_at = :create_at
+            create_at = :create_at,
+            sale_day = :sale_day
         WHERE id = :invoice_id
     """)
     db.session.execute(sql, {
         "customer_name": customer_name,
         "customer_phone": customer_phone,
         "create_at": formatted_date,
-        "total_amount": total_amount,
+        "sale_day": sale_day(create_at),
         "payment_method": payment_method,
         "remark": remark,
         "user_id": user_id,
         "invoice_id": invoice_id
     })
+    # Lines carry their invoice's day
+    db.session.execute(text("UPDATE invoice_detail SET sale_day = :sale_day WHERE invoice_id = :invoice_id"),
+                       {"sale_day": sale_day(create_at), "invoice_id": invoice_id})
     db.session.commit()
+    total_amount, line_count = invoice_total(db.session, invoice_id)
     return {
         'Message': 'Invoices Update successfully',
         'Invoices': {
             "invoice_number": invoice_number,
             "customer_name": customer_name,
             "customer_phone": customer_phone,
-            "create_at": display_date,
-            "total_amount": total_amount,
+            "create_at": create_at.date(),
+            "total_amount": from_cents(total_amount),
+            "line_count": line_count,
             "payment_method": payment_method,
             "remark": remark,
             "user_id": user_id
         }
     }
 
-@app.delete('/api/invoices/delete')
+@bp.delete('/api/invoices/delete')
 def delete_invoices():
     data = request.get_json()
     invoice_id = data.get('invoice_id')
@@ -217,10 +317,18 @@ def delete_invoices():
         'invoice_number': invoice.invoice_number,
         'customer_name': invoice.customer_name,
         'customer_phone': invoice.customer_phone,
-        'total_amount': invoice.total_amount,
+        'total_amount': from_cents(invoice.total_amount),
+        'line_count': invoice.line_count,
         'payment_method': invoice.payment_method,
         'remark': invoice.remark
     }
+    # Lines go with the invoice, in the same transaction, and their stock goes back on the shelf;
+    # otherwise the sales reports (which read invoice_detail alone) keep counting them
+    lines = db.session.execute(text("SELECT id, product_id, qty FROM invoice_detail WHERE invoice_id = :invoice_id"),
+                               {'invoice_id': invoice_id}).fetchall()
+    db.session.execute(text("DELETE FROM invoice_detail WHERE invoice_id = :invoice_id"), {'invoice_id': invoice_id})
+    for line in lines:
+        return_stock(db.session, line.product_id, int(line.qty or 0), line.id)
     sql = text("DELETE FROM invoice WHERE id = :invoice_id")
     db.session.execute(sql, {'invoice_id': invoice_id})
     db.session.commit()
@@ -1,57 +1,128 @@
 import uuid
 from datetime import datetime
 
-from app import app, db
-from flask import jsonify, request
+from extensions import db
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
 from sqlalchemy import text
 from model.invoice_detail import InvoiceDetail
+from services.invoice_totals import adjust_invoice_total
+from services.product_prices import UnknownProduct, price_basket, record_price_override
+from services.stock import OutOfStock, apply_movement, return_stock
+from utils.fields import FieldError, field_error, requested_fields, select_list
+from utils.money import from_cents, money_row, money_rows, to_cents
 from werkzeug.utils import secure_filename
 import os
 
-@app.get('/api/invoice_details')
+bp = Blueprint('invoice_detail', __name__)
+
+INVOICE_DETAIL_COLUMNS = {
+    'id': 'd.id',
+    'invoice_id': 'd.invoice_id',
+    'product_id': 'd.product_id',
+    'qty': 'd.qty',
+    'price': 'd.price',
+    'subtotal': 'd.subtotal',
+    'create_at': 'd.create_at',
+}
+INVOICE_DETAIL_TYPES = {'create_at': db.DateTime}
+
+
+def list_invoice_details():
+    fields = requested_fields(INVOICE_DETAIL_COLUMNS)
+    sql = text(f"SELECT {select_list(INVOICE_DETAIL_COLUMNS, fields)} FROM invoice_detail as d").columns(**INVOICE_DETAIL_TYPES)
+    return money_rows(db.session.execute(sql), 'price', 'subtotal')
+
+
+@bp.get('/api/invoice_details')
 def get_invoice_details():
-    sql = text("""SELECT id.id, id.invoice_id,id.product_id,id.qty, id.price,id.subtotal ,id.create_at FROM invoice_detail as id
-            JOIN product as p
-            ON id.product_id = p.id
-            JOIN invoice as i 
-            ON id.invoice_id = i.id
-    """)
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_invoice_details()
+    except FieldError as e:
+        return field_error(e)
     if not rows:
         return jsonify({'message': 'No invoice details found'})
     return jsonify(rows)
 
-@app.get('/api/invoice_details/list')
+@bp.get('/api/invoice_details/list')
 def get_all_invoice_details():
-    sql = text("""SELECT id.id, id.invoice_id,id.product_id,id.qty, id.price,id.subtotal ,id.create_at FROM invoice_detail as id
-            JOIN product as p
-            ON id.product_id = p.id
-            JOIN invoice as i 
-            ON id.invoice_id = i.id
-    """)
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_invoice_details()
+    except FieldError as e:
+        return field_error(e)
     if not rows:
         return jsonify({'message': 'No invoice details found'})
     return jsonify(rows)
 
-@app.get('/api/invoice_details/list/<int:id>')
+@bp.get('/api/invoice_details/list/<int:id>')
 def get_invoice_details_by_id(id):
     sql = text("""SELECT id.id, id.invoice_id,id.product_id,id.qty, id.price,id.subtotal ,id.create_at FROM invoice_detail as id
-            JOIN product as p
-            ON id.product_id = p.id
-            JOIN invoice as i 
-            ON id.invoice_id = i.id
             where id.id = :id
-                      """)
+                      """).columns(**INVOICE_DETAIL_TYPES)
     result = db.session.execute(sql, {'id': id}).fetchall()
     if not result:
         return jsonify({'error': 'invoice details not found'})
-    rows = [dict(row._mapping) for row in result]
+    rows = money_rows(result, 'price', 'subtotal')
     return jsonify(rows)
 
-@app.post('/api/invoice_details/create')
+def parse_qty(value):
+    qty = float(value)
+    if qty <= 0 or not qty.is_integer():
+        raise ValueError(value)
+    return int(qty)
+
+
+def parse_price(value):
+    """A client price is optional: None means charge the list price; otherwise cents."""
+    if value is None or value == '':
+        return None
+    price = to_cents(value)
+    if price < 0:
+        raise ValueError(value)
+    return price
+
+
+def out_of_stock(e):
+    db.session.rollback()
+    return jsonify({'error': 'Insufficient stock', 'product_id': e.product_id, 'qty': e.qty}), 409
+
+
+def unknown_product(e):
+    db.session.rollback()
+    return jsonify({'error': 'Product not found', 'product_ids': e.product_ids}), 404
+
+
+def override_user():
+    """(user_id, None) when the caller may override list prices, else (None, error response).
+
+    The routes stay open for list-priced lines; a client price needs a signed-in user
+    with one of PRICE_OVERRIDE_ROLES, who is recorded on the override.
+    """
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return None, (jsonify({'error': 'Price overrides require a signed-in manager'}), 401)
+    if get_jwt().get('role') not in current_app.config['PRICE_OVERRIDE_ROLES']:
+        return None, (jsonify({'error': 'Your role cannot override prices'}), 403)
+    return user_id, None
+
+
+def insert_line(invoice_id, line, create_at):
+    result = db.session.execute(text("""
+           INSERT INTO invoice_detail (invoice_id, product_id, qty, price, subtotal, create_at, sale_day)
+           VALUES (:invoice_id, :product_id, :qty, :price, :subtotal, :create_at,
+                   (SELECT sale_day FROM invoice WHERE id = :invoice_id))
+       """), {
+        'invoice_id': invoice_id,
+        'product_id': line['product_id'],
+        'qty': line['qty'],
+        'price': line['price'],
+        'subtotal': line['subtotal'],
+        'create_at': create_at
+    })
+    return result.lastrowid
+
+@bp.post('/api/invoice_details/create')
 def create_invoice_details():
     data = request.get_json()
     if not data:
@@ -67,54 +138,120 @@ def create_invoice_details():
         return {'error': 'No product_id provided'}
     if not qty:
         return {'error': 'No qty provided'}
-    if not price:
-        return {'error': 'No price provided'}
 
     create_at = datetime.now()
     formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
 
     if not str(invoice_id).isdigit():
         return jsonify({'error': 'invoice_id must be a number'})
     if not str(product_id).isdigit():
         return jsonify({'error': 'product_id must be a number'})
     try:
-        qty = float(qty)
+        qty = parse_qty(qty)
     except (ValueError, TypeError):
-        return jsonify({'error': 'qty must be a number'})
+        return jsonify({'error': 'qty must be a whole number'})
     try:
-        price = float(price)
+        price = parse_price(price)
     except (ValueError, TypeError):
-        return jsonify({'error': 'price must be a number'})
+        return jsonify({'error': 'price must be a positive number'})
 
-    subtotal = qty * price
+    try:
+        line = price_basket(db.session, [{'product_id': int(product_id), 'qty': qty, 'price': price}])[0]
+    except UnknownProduct as e:
+        return unknown_product(e)
+    if line['override']:
+        user_id, error = override_user()
+        if error:
+            return error
 
-    sql = text("""
-           INSERT INTO invoice_detail (invoice_id, product_id, qty, price, subtotal, create_at)
-           VALUES (:invoice_id, :product_id, :qty, :price, :subtotal, :create_at)
-       """)
-    db.session.execute(sql, {
-        'invoice_id': invoice_id,
-        'product_id': product_id,
-        'qty': qty,
-        'price': price,
-        'subtotal': subtotal,
-        'create_at': formatted_date
-    })
+    invoice_detail_id = insert_line(invoice_id, line, formatted_date)
+    # Same transaction: the line and its stock decrement commit or roll back together
+    try:
+        apply_movement(db.session, line['product_id'], -qty, 'sale', invoice_detail_id)
+    except OutOfStock as e:
+        return out_of_stock(e)
+    except UnknownProduct as e:
+        return unknown_product(e)
+    if line['override']:
+        record_price_override(db.session, line, invoice_detail_id, data.get('price_reason'), user_id)
+    adjust_invoice_total(db.session, invoice_id, line['subtotal'], 1)
     db.session.commit()
     return {
         'Message': 'Invoices detail created successfully',
          'invoice_detail': {
             "invoice_id": invoice_id,
-            "product_id": product_id,
+            "product_id": line['product_id'],
             "qty": qty,
-            "price": price,
-            "subtotal": subtotal,
-            "create_at": display_date
+            "price": from_cents(line['price']),
+            "list_price": from_cents(line['list_price']),
+            "subtotal": from_cents(line['subtotal']),
+            "create_at": create_at.date()
         }
     }
 
-@app.put('/api/invoice_details/update')
+
+@bp.post('/api/invoice_details/basket')
+def create_invoice_basket():
+    """Add a whole basket to an invoice: one price lookup, one total update, one commit."""
+    data = request.get_json(silent=True) or {}
+    invoice_id = data.get('invoice_id')
+    items = data.get('items')
+
+    if not str(invoice_id or '').isdigit():
+        return jsonify({'error': 'invoice_id must be a number'}), 400
+    if not items or not isinstance(items, list):
+        return jsonify({'error': 'No items provided'}), 400
+    invoice_id = int(invoice_id)
+    if db.session.execute(text("SELECT 1 FROM invoice WHERE id = :id"), {'id': invoice_id}).first() is None:
+        return jsonify({'error': 'Invoice not found'}), 404
+
+    basket = []
+    for item in items:
+        try:
+            basket.append({
+                'product_id': int(item['product_id']),
+                'qty': parse_qty(item['qty']),
+                'price': parse_price(item.get('price')),
+            })
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return jsonify({'error': 'Each item needs a product_id, a whole qty and an optional price', 'item': item}), 400
+
+    try:
+        lines = price_basket(db.session, basket)
+    except UnknownProduct as e:
+        return unknown_product(e)
+
+    user_id = None
+    if any(line['override'] for line in lines):
+        user_id, error = override_user()
+        if error:
+            return error
+
+    create_at = datetime.now()
+    for line in lines:
+        line['invoice_detail_id'] = insert_line(invoice_id, line, create_at.strftime("%Y-%m-%d"))
+        try:
+            apply_movement(db.session, line['product_id'], -line['qty'], 'sale', line['invoice_detail_id'])
+        except OutOfStock as e:
+            return out_of_stock(e)
+        except UnknownProduct as e:
+            return unknown_product(e)
+        if line['override']:
+            record_price_override(db.session, line, line['invoice_detail_id'], data.get('price_reason'), user_id)
+    total = sum(line['subtotal'] for line in lines)
+    adjust_invoice_total(db.session, invoice_id, total, len(lines))
+    db.session.commit()
+    for line in lines:
+        line.pop('override')
+    return jsonify({
+        'Message': 'Invoice lines created successfully',
+        'invoice_id': invoice_id,
+        'total': from_cents(total),
+        'lines': [money_row(line, 'price', 'list_price', 'subtotal') for line in lines],
+        'create_at': create_at.date(),
+    }), 201
+
+@bp.put('/api/invoice_details/update')
 def update_invoice_details():
     data = request.get_json()
     invoice_detail_id = data.get('invoice_detail_id')
@@ -137,13 +274,43 @@ def update_invoice_details():
         return {'error': 'No product_id provided'}
     if not qty:
         return {'error': 'No qty provided'}
-    if not price:
-        return {'error': 'No price provided'}
+    if not str(invoice_id).isdigit():
+        return jsonify({'error': 'invoice_id must be a number'})
+    if not str(product_id).isdigit():
+        return jsonify({'error': 'product_id must be a number'})
+    try:
+        qty = parse_qty(qty)
+    except (ValueError, TypeError):
+        return jsonify({'error': 'qty must be a whole number'})
+    try:
+        price = parse_price(price)
+    except (ValueError, TypeError):
+        return jsonify({'error': 'price must be a positive number'})
+    invoice_id = int(invoice_id)
+    product_id = int(product_id)
+    old_product_id = invoices.product_id
+    old_qty = int(invoices.qty or 0)
+    old_invoice_id = invoices.invoice_id
+    old_subtotal = invoices.subtotal or 0
+
+    # Without a client price the line keeps what it was sold at, unless the product changes
+    client_price = price
+    if price is None and product_id == old_product_id:
+        price = invoices.price
+    try:
+        line = price_basket(db.session, [{'product_id': product_id, 'qty': qty, 'price': price}])[0]
+    except UnknownProduct as e:
+        return unknown_product(e)
+    overridden = client_price is not None and line['override']
+    if overridden:
+        user_id, error = override_user()
+        if error:
+            return error
+    price = line['price']
+    subtotal = line['subtotal']
 
     create_at = datetime.now()
     formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
-    subtotal = qty * price
     sql = text("""
       UPDATE invoice_detail
         SET invoice_id = :invoice_id,
@@ -151,7 +318,8 @@ def update_invoice_details():
             qty = :qty,
             price = :price,
             subtotal = :subtotal,
-            create_at = :create_at
+            create_at = :create_at,
+            sale_day = (SELECT sale_day FROM invoice WHERE id = :invoice_id)
         WHERE id = :invoice_detail_id
     """)
     db.session.execute(sql, {
@@ -163,6 +331,24 @@ def update_invoice_details():
         'create_at': formatted_date,
         "invoice_detail_id": invoice_detail_id
     })
+    try:
+        if product_id != old_product_id:
+            return_stock(db.session, old_product_id, old_qty, invoice_detail_id)
+            apply_movement(db.session, product_id, -qty, 'sale', invoice_detail_id)
+        elif qty != old_qty:
+            apply_movement(db.session, product_id, old_qty - qty,
+                           'sale' if qty > old_qty else 'return', invoice_detail_id)
+    except OutOfStock as e:
+        return out_of_stock(e)
+    except UnknownProduct as e:
+        return unknown_product(e)
+    if overridden:
+        record_price_override(db.session, line, invoice_detail_id, data.get('price_reason'), user_id)
+    if invoice_id != old_invoice_id:
+        adjust_invoice_total(db.session, old_invoice_id, -old_subtotal, -1)
+        adjust_invoice_total(db.session, invoice_id, subtotal, 1)
+    else:
+        adjust_invoice_total(db.session, invoice_id, subtotal - old_subtotal)
     db.session.commit()
     return {
         'Message': 'invoice details Update successfully',
@@ -170,14 +356,15 @@ def update_invoice_details():
             "invoice_id": invoice_id,
             "product_id": product_id,
             "qty": qty,
-            "price": price,
-            "subtotal": subtotal,
-            "create_at": display_date,
+            "price": from_cents(price),
+            "list_price": from_cents(line['list_price']),
+            "subtotal": from_cents(subtotal),
+            "create_at": create_at.date(),
             "invoice_detail_id": invoice_detail_id
         }
     }
 
-@app.delete('/api/invoice_details/delete')
+@bp.delete('/api/invoice_details/delete')
 def delete_invoice_details():
     data = request.get_json()
     invoice_detail_id = data.get('invoice_detail_id')
@@ -194,13 +381,15 @@ def delete_invoice_details():
         'invoice_id': invoice_detail.invoice_id,
         'product_id': invoice_detail.product_id,
         'qty': invoice_detail.qty,
-        'price': invoice_detail.price,
-        'subtotal': invoice_detail.subtotal,
+        'price': from_cents(invoice_detail.price),
+        'subtotal': from_cents(invoice_detail.subtotal),
         'create_at': invoice_detail.create_at
 
     }
     sql = text("DELETE FROM invoice_detail  WHERE id = :invoice_detail_id")
     db.session.execute(sql, {'invoice_detail_id': invoice_detail_id})
+    return_stock(db.session, invoice_detail.product_id, int(invoice_detail.qty or 0), invoice_detail_id)
+    adjust_invoice_total(db.session, invoice_detail.invoice_id, -(invoice_detail.subtotal or 0), -1)
     db.session.commit()
     return {
         'Message': 'Invoice detail Delete successfully',
@@ -0,0 +1,11 @@
+from flask import Blueprint, current_app
+
+from utils.metrics import render_prometheus, snapshot
+
+bp = Blueprint('metrics', __name__)
+
+
+# Per worker process: scrape each worker (or run one) to see the whole picture
+@bp.get('/metrics')
+def metrics():
+    return current_app.response_class(render_prometheus(snapshot()), mimetype='text/plain; version=0.0.4')
@@ -1,32 +1,51 @@
-import uuid
+import re
 from datetime import datetime
-from app import app, db
-from flask import jsonify, request
+from extensions import db
+from flask import Blueprint, jsonify, request
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from model import Product
-from werkzeug.utils import secure_filename
+from services.product_codes import discard_product_code, lookup_product_code, refresh_product_code
+from services.product_prices import UnknownProduct, discard_product_price, set_product_price
+from services.stock import OutOfStock, apply_movement
+from utils.fields import FieldError, field_error, requested_fields, select_list
+from utils.money import from_cents, money_row, money_rows, to_cents
+from utils.uploads import UploadError, save_image
 import os
 
+bp = Blueprint('product', __name__)
+
 def get_full_image_url(image_path):
     if not image_path:
         return None
     return request.host_url.rstrip('/') + image_path
 
-@app.get('/api/products')
-@app.get('/api/products/list')
+# ?fields= names for the listing -> SQL expression
+PRODUCT_COLUMNS = {
+    'id': 'p.id',
+    'product_name': 'UPPER(p.name)',
+    'price': 'p.price',
+    'stock': 'p.stock',
+    'description': 'p.description',
+    'image': 'p.image',
+    'category_name': 'c.name',
+    'create_at': 'p.create_at',
+}
+PRODUCT_TYPES = {'create_at': db.Date}
+
+
+@bp.get('/api/products')
+@bp.get('/api/products/list')
 def get_products():
-    sql = text("""
-        SELECT p.id,
-               UPPER(p.name) AS product_name,
-               p.price,
-               p.stock,
-               p.description,
-               p.image,
-               c.name AS category_name,
-               p.create_at
+    try:
+        fields = requested_fields(PRODUCT_COLUMNS)
+    except FieldError as e:
+        return field_error(e)
+    sql = text(f"""
+        SELECT {select_list(PRODUCT_COLUMNS, fields)}
         FROM product AS p
         JOIN category AS c ON p.category_id = c.id
-    """)
+    """).columns(**PRODUCT_TYPES)
 
     result = db.session.execute(sql).fetchall()
     if not result:
@@ -38,30 +57,19 @@ def get_products():
             "products": []
         })
 
-    rows = []
-    total_price = 0
-    total_stock = 0
-    categories = set()
-
-    for row in result:
-        r = dict(row._mapping)
-        r['image'] = get_full_image_url(r['image'])
-
-        total_price += r['price']
-        total_stock += r['stock']
-        categories.add(r['category_name'])
-
-        rows.append(r)
-
+    rows = money_rows(result, 'price')
+    if 'image' in fields:
+        for r in rows:
+            r['image'] = get_full_image_url(r['image'])
     return jsonify(rows)
 
 
 # --- GET product by ID ---
-@app.get('/api/products/list/<int:id>')
+@bp.get('/api/products/list/<int:id>')
 def get_product_by_id(id):
     sql = text("""
         SELECT p.id, UPPER(p.name) as product_name, 'true' as active, 
-               '$' || p.price AS price, p.stock, p.description, 
+               p.price, p.stock, p.description, 
                p.image, c.name as category_name
         FROM product AS p
         JOIN category AS c ON p.category_id = c.id
@@ -74,28 +82,94 @@ def get_product_by_id(id):
     rows = []
     for row in result:
         r = dict(row._mapping)
+        r['price'] = from_cents(r['price'])
         r['image'] = get_full_image_url(r['image'])
         rows.append(r)
 
     return jsonify(rows)
 
-UPLOAD_FOLDER = 'static/images'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# --- Scanner lookup: barcode/SKU -> product from the in-memory code index ---
+@bp.get('/api/products/by-code/<code>')
+def get_product_by_code(code):
+    product = lookup_product_code(db.session, code)
+    if not product:
+        return jsonify({'error': 'Product not found'}), 404
+    return jsonify({**product, 'image': get_full_image_url(product['image'])})
+
+
+def fts_query(q):
+    """Turn free text into an FTS5 prefix query: 'red ros' -> '"red"* "ros"*'."""
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', q))
+
+
+# --- Search products by name, description or category name ---
+@bp.get('/api/products/search')
+def search_products():
+    q = (request.args.get('q') or '').strip()
+    match = fts_query(q)
+    if not match:
+        return jsonify({'error': 'No search query provided'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    params = {'q': match, 'limit': per_page, 'offset': (page - 1) * per_page}
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-@app.post('/api/products/create')
+    if db.session.get_bind().dialect.name == 'sqlite':
+        # bm25 weights: name matches count most, then category, then description
+        sql = text("""
+            SELECT p.id,
+                   UPPER(p.name) AS product_name,
+                   p.price,
+                   p.stock,
+                   p.description,
+                   p.image,
+                   f.category_name,
+                   p.create_at
+            FROM product_fts AS f
+            JOIN product AS p ON p.id = f.rowid
+            WHERE product_fts MATCH :q
+            ORDER BY bm25(product_fts, 10.0, 1.0, 5.0)
+            LIMIT :limit OFFSET :offset
+        """).columns(**PRODUCT_TYPES)
+        count_sql = text("SELECT COUNT(*) FROM product_fts WHERE product_fts MATCH :q")
+    else:
+        params['q'] = '%' + q.lower() + '%'
+        where = """FROM product AS p
+            JOIN category AS c ON p.category_id = c.id
+            WHERE LOWER(p.name) LIKE :q OR LOWER(p.description) LIKE :q OR LOWER(c.name) LIKE :q"""
+        sql = text(f"""
+            SELECT p.id, UPPER(p.name) AS product_name, p.price, p.stock, p.description,
+                   p.image, c.name AS category_name, p.create_at
+            {where}
+            ORDER BY p.name
+            LIMIT :limit OFFSET :offset
+        """).columns(**PRODUCT_TYPES)
+        count_sql = text(f"SELECT COUNT(*) {where}")
+
+    total = db.session.execute(count_sql, params).scalar()
+    rows = []
+    for row in db.session.execute(sql, params):
+        r = money_row(row, 'price')
+        r['image'] = get_full_image_url(r['image'])
+        rows.append(r)
+
+    return jsonify({
+        'query': q,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'products': rows
+    })
+
+@bp.post('/api/products/create')
 def create_products():
     name = request.form.get('name')
     price = request.form.get('price')
     stock = request.form.get('stock')
     description = request.form.get('description')
     category_id = request.form.get('category_id')
+    sku = (request.form.get('sku') or '').strip() or None
     create_at = datetime.now()
     formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
 
     if not name:
         return {'error': 'No product name provided'}
@@ -106,50 +180,62 @@ def create_products():
     if not category_id:
         return {'error': 'No category_id provided'}
     try:
-        price = float(price)
+        price = to_cents(price)
         stock = int(stock)
         category_id = int(category_id)
     except ValueError:
         return {'error': 'Invalid numeric value'}
+    if stock < 0:
+        return {'error': 'stock must not be negative'}, 400
 
     image_url = None
     if 'image' in request.files:
-        image = request.files['image']
-        if image and allowed_file(image.filename):
-            filename = f"{uuid.uuid4().hex}_{secure_filename(image.filename)}"
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            image.save(image_path)
-            image_url = f"/{image_path.replace(os.sep, '/')}"
-        else:
-            return {'error': 'Invalid image file type'}
+        try:
+            image_url = save_image(request.files['image'])
+        except UploadError as e:
+            return {'error': str(e)}
     sql = text("""
-        INSERT INTO product (name, price, stock, description, image, category_id,create_at)
-        VALUES (:name, :price, :stock, :description, :image, :category_id,:create_at)
+        INSERT INTO product (name, sku, price, stock, description, image, category_id,create_at)
+        VALUES (:name, :sku, :price, :stock, :description, :image, :category_id,:create_at)
     """)
-    db.session.execute(sql, {
-        "name": name,
-        "price": price,
-        "stock": stock,
-        "description": description,
-        "image": image_url,
-        "category_id": category_id,
-        "create_at": formatted_date,
-    })
-    db.session.commit()
+    try:
+        result = db.session.execute(sql, {
+            "name": name,
+            "sku": sku,
+            "price": price,
+            "stock": 0,
+            "description": description,
+            "image": image_url,
+            "category_id": category_id,
+            "create_at": formatted_date,
+        })
+        # Opening stock goes through the ledger like any other delivery
+        apply_movement(db.session, result.lastrowid, stock, 'receipt')
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {'error': 'SKU already exists'}
+    except OutOfStock:
+        db.session.rollback()
+        return {'error': 'stock must not be negative'}, 400
+    set_product_price(result.lastrowid, price)
+    if sku:
+        refresh_product_code(db.session, sku)
     return {
         'Message': 'Product created successfully',
         'Products': {
             "name": name,
-            "price": price,
+            "sku": sku,
+            "price": from_cents(price),
             "stock": stock,
             "description": description,
             "image": image_url,
             "category_id": category_id,
-            "create_at": display_date,
+            "create_at": create_at.date(),
         }
     }
 
-@app.put('/api/products/update/<int:id>')
+@bp.put('/api/products/update/<int:id>')
 def update_product(id):
     product = Product.query.get(id)
     if not product:
@@ -160,6 +246,7 @@ def update_product(id):
     stock = request.form.get('stock')
     description = request.form.get('description')
     category_id = request.form.get('category_id')
+    sku = (request.form.get('sku') or '').strip() or None
 
     if not name:
         return {'error': 'No product name provided'}
@@ -170,47 +257,64 @@ def update_product(id):
     if not category_id:
         return {'error': 'No category_id provided'}
     try:
-        price = float(price)
+        price = to_cents(price)
         stock = int(stock)
         category_id = int(category_id)
     except ValueError:
         return {'error': 'Invalid numeric value'}
+    if stock < 0:
+        return {'error': 'stock must not be negative'}, 400
     image_url = None
     if 'image' in request.files:
-        image = request.files['image']
-        if image and allowed_file(image.filename):
-            filename = f"{uuid.uuid4().hex}_{secure_filename(image.filename)}"
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            image.save(image_path)
-            image_url = f"/{image_path.replace(os.sep, '/')}"
-        else:
-            return {'error': 'Invalid image file type'}
+        try:
+            image_url = save_image(request.files['image'])
+        except UploadError as e:
+            return {'error': str(e)}
+    old_sku = product.sku
     product.name = name
+    if 'sku' in request.form:  # absent keeps the barcode; an empty value clears it
+        product.sku = sku
     product.price = price
-    product.stock = stock
     product.description = description
     product.image = image_url
     product.category_id = category_id
     product.create_at = datetime.now()
 
-    db.session.commit()
+    try:
+        # Setting an absolute stock level is recorded as an adjustment of the difference
+        apply_movement(db.session, product.id, stock - (product.stock or 0), 'adjustment')
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {'error': 'SKU already exists'}
+    except OutOfStock:
+        db.session.rollback()
+        return jsonify({'error': 'Stock changed while updating, please retry'}), 409
+    except UnknownProduct:
+        db.session.rollback()
+        return jsonify({'error': 'Product not found'}), 404
+    set_product_price(product.id, price)
+    discard_product_code(old_sku)
+    if product.sku:
+        refresh_product_code(db.session, product.sku)
     return jsonify({
         'Message': 'Product updated successfully',
         'Product': {
             'id': product.id,
             'name': product.name,
-            'price': product.price,
+            'sku': product.sku,
+            'price': from_cents(product.price),
             'stock': product.stock,
             'description': product.description,
             'image': product.image,
             'category_id': product.category_id,
-            'create_at': product.create_at.strftime("%d-%m-%Y")
+            'create_at': product.create_at
 
 
         }
     })
 
-@app.delete('/api/products/delete')
+@bp.delete('/api/products/delete')
 def delete_product():
     data = request.get_json()
     product_id = data.get('product_id')
@@ -222,20 +326,24 @@ def delete_product():
         image_path = product.image.lstrip('/')
         if os.path.exists(image_path):
             os.remove(image_path)
+    db.session.execute(text("DELETE FROM stock_movement WHERE product_id = :id"), {'id': product.id})
+    db.session.execute(text("DELETE FROM stock_snapshot WHERE product_id = :id"), {'id': product.id})
     db.session.delete(product)
     db.session.commit()
+    discard_product_code(product.sku)
+    discard_product_price(product.id)
 
     return {
         'message': 'Product deleted successfully',
         'Product': {
             'id': product.id,
             'name': product.name,
-            'price': product.price,
+            'price': from_cents(product.price),
             'stock': product.stock,
             'description': product.description,
             'image': product.image,
             'category_id': product.category_id,
-            'create_at': product.create_at.strftime("%d-%m-%Y")
+            'create_at': product.create_at
         }
     }
 
@@ -1,15 +1,18 @@
-from flask import jsonify
+from flask import Blueprint, jsonify
 from sqlalchemy import func
 from model.reporting import SalesReport
-from model.invoice_detail import InvoiceDetail
-from model.invoice import Invoice
 from model.product import Product
 from model.category import Category
 from model.user import User
-from app import db, app
+from extensions import db
+from services.archive import sales_models
+from utils.dates import sale_day
+from utils.money import from_cents
 from datetime import datetime, timedelta, date
 from calendar import monthrange
 
+bp = Blueprint('salereport', __name__)
+
 # ------------------- GENERATE SALE REPORT -------------------
 def generate_report(period='daily', criteria_type='sale'):
     """
@@ -43,17 +46,19 @@ def generate_report(period='daily', criteria_type='sale'):
     ).delete()
     db.session.commit()
 
+    # Hot tables, or hot + archive years when the period reaches back that far
+    start_day, end_day = sale_day(start_date), sale_day(end_date)
+    invoices, lines = sales_models(db.session, start_day, end_day)
+
     # ------------------- Build query -------------------
     if criteria_type == 'sale':
         query = (
             db.session.query(
-                func.sum(InvoiceDetail.qty * InvoiceDetail.price).label('total_sales'),
-                func.sum(InvoiceDetail.qty).label('total_qty'),
-                func.count(func.distinct(InvoiceDetail.invoice_id)).label('total_invoices')
+                func.sum(lines.qty * lines.price).label('total_sales'),
+                func.sum(lines.qty).label('total_qty'),
+                func.count(func.distinct(lines.invoice_id)).label('total_invoices')
             )
-            .join(Invoice, Invoice.id == InvoiceDetail.invoice_id)
-            .filter(func.date(Invoice.create_at) >= start_date)
-            .filter(func.date(Invoice.create_at) <= end_date)
+            .filter(lines.sale_day.between(start_day, end_day))
         )
         result = query.first()
         total_sales = result.total_sales or 0
@@ -83,20 +88,20 @@ def generate_report(period='daily', criteria_type='sale'):
 
         return jsonify({
             "criteria_name": report.criteria_name,
-            "total_sales": report.total_sales,
+            "total_sales": from_cents(report.total_sales),
             "total_qty": report.total_qty,
             "total_invoices": report.total_invoices,
             "start_date": report.start_date.isoformat(),
             "end_date": report.end_date.isoformat()
         })
 
-@app.get('/api/sales_report/generate/daily')
+@bp.get('/api/sales_report/generate/daily')
 def total_daily(): return generate_report('daily','sale')
 
-@app.get('/api/sales_report/generate/weekly')
+@bp.get('/api/sales_report/generate/weekly')
 def total_weekly(): return generate_report('weekly','sale')
 
-@app.get('/api/sales_report/generate/monthly')
+@bp.get('/api/sales_report/generate/monthly')
 def total_monthly(): return generate_report('monthly','sale')
 
 
@@ -124,16 +129,18 @@ def generate_total_report(period='daily'):
     ).delete()
     db.session.commit()
 
+    # Hot tables, or hot + archive years when the period reaches back that far
+    start_day, end_day = sale_day(start_date), sale_day(end_date)
+    invoices, lines = sales_models(db.session, start_day, end_day)
+
     # Query total sales for the period
     total_query = (
         db.session.query(
-            func.sum(InvoiceDetail.qty * InvoiceDetail.price).label('total_sales'),
-            func.sum(InvoiceDetail.qty).label('total_qty'),
-            func.count(func.distinct(InvoiceDetail.invoice_id)).label('total_invoices')
+            func.sum(lines.qty * lines.price).label('total_sales'),
+            func.sum(lines.qty).label('total_qty'),
+            func.count(func.distinct(lines.invoice_id)).label('total_invoices')
         )
-        .join(Invoice, Invoice.id == InvoiceDetail.invoice_id)
-        .filter(func.date(Invoice.create_at) >= start_date)
-        .filter(func.date(Invoice.create_at) <= end_date)
+        .filter(lines.sale_day.between(start_day, end_day))
     )
 
     result = total_query.first()
@@ -167,18 +174,18 @@ def generate_total_report(period='daily'):
         "period": period,
         "start_date": report.start_date.isoformat(),
         "end_date": report.end_date.isoformat(),
-        "total_sales": report.total_sales,
+        "total_sales": from_cents(report.total_sales),
         "total_qty": report.total_qty,
         "total_invoices": report.total_invoices
     })
-@app.get('/api/sales_report/generate/product/daily')
+@bp.get('/api/sales_report/generate/product/daily')
 def generate_product_daily_report():
     return generate_total_report(period='daily')
-@app.get('/api/sales_report/generate/product/weekly')
+@bp.get('/api/sales_report/generate/product/weekly')
 def generate_product_weekly_report():
     return generate_total_report(period='weekly')
 
-@app.get('/api/sales_report/generate/product/monthly')
+@bp.get('/api/sales_report/generate/product/monthly')
 def generate_product_monthly_report():
     return generate_total_report(period='monthly')
 
@@ -211,20 +218,22 @@ def generate_category_report(period='daily'):
     ).delete()
     db.session.commit()
 
+    # Hot tables, or hot + archive years when the period reaches back that far
+    start_day, end_day = sale_day(start_date), sale_day(end_date)
+    invoices, lines = sales_models(db.session, start_day, end_day)
+
     # Query invoices grouped by category within the period
     category_query = (
         db.session.query(
             Category.id.label('criteria_id'),
             Category.name.label('criteria_name'),
-            func.sum(InvoiceDetail.qty * InvoiceDetail.price).label('total_sales'),
-            func.sum(InvoiceDetail.qty).label('total_qty'),
-            func.count(func.distinct(InvoiceDetail.invoice_id)).label('total_invoices')
+            func.sum(lines.qty * lines.price).label('total_sales'),
+            func.sum(lines.qty).label('total_qty'),
+            func.count(func.distinct(lines.invoice_id)).label('total_invoices')
         )
         .join(Product, Product.category_id == Category.id)
-        .join(InvoiceDetail, InvoiceDetail.product_id == Product.id)
-        .join(Invoice, Invoice.id == InvoiceDetail.invoice_id)
-        .filter(func.date(Invoice.create_at) >= start_date)
-        .filter(func.date(Invoice.create_at) <= end_date)
+        .join(lines, lines.product_id == Product.id)
+        .filter(lines.sale_day.between(start_day, end_day))
         .group_by(Category.id)
     )
 
@@ -255,19 +264,19 @@ def generate_category_report(period='daily'):
     return jsonify([{
         "criteria_id": r.criteria_id,
         "criteria_name": r.criteria_name,
-        "total_sales": r.total_sales,
+        "total_sales": from_cents(r.total_sales),
         "total_qty": r.total_qty,
         "total_invoices": r.total_invoices,
         "start_date": r.start_date.isoformat(),
         "end_date": r.end_date.isoformat()
     } for r in reports])
-@app.get('/api/sales_report/generate/category/daily')
+@bp.get('/api/sales_report/generate/category/daily')
 def category_daily(): return generate_category_report('daily')
 
-@app.get('/api/sales_report/generate/category/weekly')
+@bp.get('/api/sales_report/generate/category/weekly')
 def category_weekly(): return generate_category_report('weekly')
 
-@app.get('/api/sales_report/generate/category/monthly')
+@bp.get('/api/sales_report/generate/category/monthly')
 def category_monthly(): return generate_category_report('monthly')
 
 
@@ -297,19 +306,22 @@ def generate_user_report(period='daily'):
     ).delete()
     db.session.commit()
 
+    # Hot tables, or hot + archive years when the period reaches back that far
+    start_day, end_day = sale_day(start_date), sale_day(end_date)
+    invoices, lines = sales_models(db.session, start_day, end_day)
+
     # Query invoices grouped by user
     user_query = (
         db.session.query(
             User.id.label('criteria_id'),
             User.name.label('criteria_name'),
-            func.sum(InvoiceDetail.qty * InvoiceDetail.price).label('total_sales'),
-            func.sum(InvoiceDetail.qty).label('total_qty'),
-            func.count(func.distinct(InvoiceDetail.invoice_id)).label('total_invoices')
+            func.sum(lines.qty * lines.price).label('total_sales'),
+            func.sum(lines.qty).label('total_qty'),
+            func.count(func.distinct(lines.invoice_id)).label('total_invoices')
         )
-        .join(Invoice, Invoice.user_id == User.id)
-        .join(InvoiceDetail, InvoiceDetail.invoice_id == Invoice.id)
-        .filter(func.date(Invoice.create_at) >= start_date)
-        .filter(func.date(Invoice.create_at) <= end_date)
+        .join(invoices, invoices.user_id == User.id)
+        .join(lines, lines.invoice_id == invoices.id)
+        .filter(invoices.sale_day.between(start_day, end_day))
         .group_by(User.id)
     )
 
@@ -340,18 +352,18 @@ def generate_user_report(period='daily'):
     return jsonify([{
         "criteria_id": r.criteria_id,
         "criteria_name": r.criteria_name,
-        "total_sales": r.total_sales,
+        "total_sales": from_cents(r.total_sales),
         "total_qty": r.total_qty,
         "total_invoices": r.total_invoices,
         "start_date": r.start_date.isoformat(),
         "end_date": r.end_date.isoformat()
     } for r in reports])
 
-@app.get('/api/sales_report/generate/user/daily')
+@bp.get('/api/sales_report/generate/user/daily')
 def user_daily(): return generate_user_report('daily')
 
-@app.get('/api/sales_report/generate/user/weekly')
+@bp.get('/api/sales_report/generate/user/weekly')
 def user_weekly(): return generate_user_report('weekly')
 
-@app.get('/api/sales_report/generate/user/monthly')
+@bp.get('/api/sales_report/generate/user/monthly')
 def user_monthly(): return generate_user_report('monthly')
@@ -0,0 +1,89 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Blueprint, abort, current_app, render_template, request, send_from_directory
+from werkzeug.security import safe_join
+
+bp = Blueprint('assets', __name__)
+
+# Encodings we look for next to an image, best first (e.g. logo.svg.br, logo.svg.gz)
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+_page_cache = {}
+
+
+def image_folder():
+    return os.path.join(current_app.root_path, current_app.config['UPLOAD_FOLDER'])
+
+
+def _immutable(response, max_age):
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    return response
+
+
+def _precompressed(folder, filename):
+    for encoding, suffix in PRECOMPRESSED:
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(folder, filename + suffix)):
+            return encoding, filename + suffix
+    return None, filename
+
+
+# --- Images: upload names are uuid-prefixed, so a URL never changes content ---
+@bp.get('/static/images/<path:filename>')
+def static_image(filename):
+    folder = image_folder()
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    max_age = current_app.config['STATIC_IMAGE_MAX_AGE']
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    # Let the front proxy stream the bytes; it handles ETag and Range itself
+    if current_app.config['STATIC_ACCEL_MODE'] == 'x-accel':
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = current_app.config['STATIC_ACCEL_PREFIX'] + filename
+        return _immutable(response, max_age)
+
+    encoding, served = _precompressed(folder, filename)
+    # conditional=True gives strong ETags, If-None-Match/If-Modified-Since and Range support;
+    # USE_X_SENDFILE (set from STATIC_ACCEL_MODE) swaps the body for an X-Sendfile header
+    response = send_from_directory(folder, served, mimetype=mimetype, max_age=max_age, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return _immutable(response, max_age)
+
+
+# --- Pages: rendered and compressed once per process ---
+def cached_page(template):
+    page = _page_cache.get(template)
+    if page is None:
+        body = render_template(template).encode('utf-8')
+        page = {
+            'identity': body,
+            'gzip': gzip.compress(body, 9),
+            'etag': hashlib.sha1(body).hexdigest(),
+        }
+        _page_cache[template] = page
+
+    if request.accept_encodings['gzip']:
+        response = current_app.response_class(page['gzip'], mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(page['etag'] + '-gz')
+    else:
+        response = current_app.response_class(page['identity'], mimetype='text/html')
+        response.set_etag(page['etag'])
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['STATIC_PAGE_MAX_AGE']
+    return response.make_conditional(request)
+
+
+@bp.route('/')
+def home():
+    return cached_page('index.html')
@@ -0,0 +1,70 @@
+from flask import Blueprint, jsonify, request
+
+from extensions import db
+from services.product_prices import UnknownProduct
+from services.stock import OutOfStock, apply_movement, current_stock
+
+bp = Blueprint('stock', __name__)
+
+# Sales and returns come from invoice lines; these are the manual movements
+MANUAL_KINDS = {'receipt', 'adjustment'}
+
+
+@bp.get('/api/stock/<int:product_id>')
+def get_stock(product_id):
+    stock = current_stock(db.session, [product_id])
+    if product_id not in stock:
+        return jsonify({'error': 'Product not found'}), 404
+    return jsonify({'product_id': product_id, 'stock': stock[product_id]})
+
+
+@bp.get('/api/stock')
+def get_stock_levels():
+    ids = request.args.get('ids', '')
+    try:
+        product_ids = [int(i) for i in ids.split(',') if i.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma-separated list of numbers'}), 400
+    if not product_ids:
+        return jsonify({'error': 'No ids provided'}), 400
+    stock = current_stock(db.session, product_ids)
+    return jsonify([{'product_id': pid, 'stock': qty} for pid, qty in stock.items()])
+
+
+@bp.post('/api/stock/movements')
+def create_stock_movement():
+    data = request.get_json(silent=True) or {}
+    product_id = data.get('product_id')
+    kind = data.get('kind')
+    qty = data.get('qty')
+
+    if not product_id:
+        return {'error': 'No product_id provided'}, 400
+    if kind not in MANUAL_KINDS:
+        return {'error': "kind must be 'receipt' or 'adjustment'"}, 400
+    try:
+        product_id = int(product_id)
+        qty = int(qty)
+    except (ValueError, TypeError):
+        return {'error': 'product_id and qty must be whole numbers'}, 400
+    if kind == 'receipt' and qty <= 0:
+        return {'error': 'A receipt must add stock'}, 400
+
+    try:
+        apply_movement(db.session, product_id, qty, kind)
+    except OutOfStock as e:
+        db.session.rollback()
+        return jsonify({'error': 'Insufficient stock', 'product_id': e.product_id, 'qty': e.qty}), 409
+    except UnknownProduct:
+        db.session.rollback()
+        return jsonify({'error': 'Product not found'}), 404
+    db.session.commit()
+    return {
+        'Message': 'Stock movement recorded',
+        'movement': {
+            'product_id': product_id,
+            'kind': kind,
+            'qty': qty,
+            'stock': current_stock(db.session, [product_id])[product_id]
+        }
+    }
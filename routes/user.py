@@ -1,57 +1,72 @@
 import re
 from datetime import datetime
 
-from app import app, db
-from flask import jsonify, request
+from extensions import db
+from flask import Blueprint, jsonify, request
 from sqlalchemy import text
-from werkzeug.utils import secure_filename
-import os
-import uuid
 from model import User
+from utils.fields import FieldError, field_error, requested_fields, select_list
+from utils.uploads import UploadError, save_image
 
 from werkzeug.security import check_password_hash, generate_password_hash
-@app.get('/api/users')
+
+bp = Blueprint('user', __name__)
+
+USER_COLUMNS = {
+    'id': 'id',
+    'name': 'UPPER(name)',
+    'active': "'true'",
+    'email': 'email',
+    'image': 'image',
+    'role': 'role',
+    'create_at': 'create_at',
+}
+USER_TYPES = {'create_at': db.DateTime}
+
+
+def list_users():
+    fields = requested_fields(USER_COLUMNS)
+    sql = text(f"SELECT {select_list(USER_COLUMNS, fields)} FROM user").columns(**USER_TYPES)
+    return [dict(row._mapping) for row in db.session.execute(sql)]
+
+
+@bp.get('/api/users')
 def get_user():
-    sql = text("SELECT id, UPPER(name) as name , 'true' as active , email ,image,role,create_at FROM user")
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_users()
+    except FieldError as e:
+        return field_error(e)
     if not rows:
         return jsonify({'message': 'No users found'})
     return jsonify(rows)
 
-@app.get('/api/users/list')
+@bp.get('/api/users/list')
 def get_all_users():
-    sql = text("SELECT id, UPPER(name) as name , 'true' as active , email, image,role,create_at FROM user")
-    result = db.session.execute(sql).fetchall()
-    rows = [dict(row._mapping) for row in result]
+    try:
+        rows = list_users()
+    except FieldError as e:
+        return field_error(e)
     return jsonify(rows)
 
 def fetch_user_by_id(user_id: int):
-    sql = text("SELECT id, UPPER(name) as name , 'true' as active , email,image,role,create_at FROM user WHERE id = :user_id")
+    sql = text("SELECT id, UPPER(name) as name , 'true' as active , email,image,role,create_at FROM user WHERE id = :user_id").columns(**USER_TYPES)
     result = db.session.execute(sql, {"user_id": user_id}).fetchone()
     if not result:
         return None
     return dict(result._mapping)
 
-@app.get('/api/users/list/<int:user_id>')
+@bp.get('/api/users/list/<int:user_id>')
 def get_user_id(user_id: int):
     user = fetch_user_by_id(user_id)
     if not user:
         return jsonify({'error': 'User not found'})
     return jsonify(user)
 
-UPLOAD_FOLDER = 'static/images'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def is_valid_email(email):
     pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
     return re.match(pattern, email) is not None
-@app.post('/api/users/create')
+@bp.post('/api/users/create')
 def create_user():
     name = request.form.get('name')
     password = request.form.get('password')
@@ -67,19 +82,14 @@ def create_user():
                         'simple':'example@gmail.com'})
     create_at = datetime.now()
     # formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
 
 
     image_url = None
     if 'image' in request.files:
-        image = request.files['image']
-        if image and allowed_file(image.filename):
-            filename = f"{uuid.uuid4().hex}_{secure_filename(image.filename)}"
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            image.save(image_path)
-            image_url = f"/{image_path.replace(os.sep, '/')}"
-        else:
-            return {'error': 'Invalid image file type'}
+        try:
+            image_url = save_image(request.files['image'])
+        except UploadError as e:
+            return {'error': str(e)}
     new_user = User(
         name=name,
         password=generate_password_hash(password),
@@ -98,11 +108,11 @@ def create_user():
                 'email': new_user.email,
                 'role': new_user.role,
                 'image': new_user.image,
-                'create_at': display_date
+                'create_at': create_at
                 }
             }
 
-@app.put('/api/users/update/<int:id>')
+@bp.put('/api/users/update/<int:id>')
 def update_user(id):
     user = User.query.get(id)
     if not user:
@@ -125,18 +135,13 @@ def update_user(id):
     user.role = role
     create_at = datetime.now()
     # formatted_date = create_at.strftime("%Y-%m-%d")
-    display_date = create_at.strftime("%d-%m-%Y")
 
     image_url = None
     if 'image' in request.files:
-        image = request.files['image']
-        if image and allowed_file(image.filename):
-            filename = f"{uuid.uuid4().hex}_{secure_filename(image.filename)}"
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            image.save(image_path)
-            image_url = f"/{image_path.replace(os.sep, '/')}"
-        else:
-            return {'error': 'Invalid image file type'}
+        try:
+            image_url = save_image(request.files['image'])
+        except UploadError as e:
+            return {'error': str(e)}
     user = User(
         name=name,
         password=generate_password_hash(password),
@@ -154,11 +159,11 @@ def update_user(id):
                 'email': user.email,
                 'role': user.role,
                 'image': user.image,
-                'create_at': display_date
+                'create_at': create_at
             }
     }
 
-@app.delete('/api/users/delete')
+@bp.delete('/api/users/delete')
 def delete_user():
     user = request.get_json()
     if not user or 'user_id' not in user:
@@ -0,0 +1,168 @@
+import os
+import re
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, select, text, union_all
+from sqlalchemy.orm import aliased
+
+from model import Invoice, InvoiceDetail
+from utils.dates import day_to_date, sale_day
+
+# Closed invoices (and their lines) move to one SQLite file per year, e.g.
+# instance/archive/sales_2023.db, attached as schema archive_2023 when a query needs it.
+ARCHIVE_FILE = re.compile(r'^sales_(\d{4})\.db$')
+ARCHIVED_TABLES = (Invoice.__table__, InvoiceDetail.__table__)
+
+_archive_tables = {}
+
+
+class ArchiveError(RuntimeError):
+    pass
+
+
+def archive_folder():
+    folder = current_app.config['ARCHIVE_FOLDER']
+    return folder if os.path.isabs(folder) else os.path.join(current_app.instance_path, folder)
+
+
+def archive_path(year):
+    return os.path.join(archive_folder(), f'sales_{year}.db')
+
+
+def archived_years():
+    folder = archive_folder()
+    if not os.path.isdir(folder):
+        return []
+    return sorted(int(m.group(1)) for m in map(ARCHIVE_FILE.match, os.listdir(folder)) if m)
+
+
+def _schema(year):
+    return f'archive_{year}'
+
+
+def archive_table(table, year):
+    """The ``table`` columns inside the year's attached schema (no FKs: SQLite can't cross files)."""
+    key = (table.name, year)
+    if key not in _archive_tables:
+        columns = [Column(c.name, c.type, primary_key=c.primary_key) for c in table.columns]
+        archived = Table(table.name, MetaData(schema=_schema(year)), *columns)
+        Index(f'ix_{table.name}_sale_day', archived.c.sale_day)
+        _archive_tables[key] = archived
+    return _archive_tables[key]
+
+
+def _attach(connection, year):
+    """ATTACH the year's file once per pooled DBAPI connection."""
+    attached = connection.connection.info.setdefault('archives', set())
+    if year in attached:
+        return
+    if connection.connection.dbapi_connection.in_transaction:
+        # SQLite refuses ATTACH inside a transaction; read the archive before writing
+        raise ArchiveError('archives must be attached before the transaction writes')
+    connection.exec_driver_sql(f'ATTACH DATABASE ? AS {_schema(year)}', (archive_path(year),))
+    attached.add(year)
+
+
+def _detach(connection, year):
+    connection.exec_driver_sql(f'DETACH DATABASE {_schema(year)}')
+    connection.connection.info.get('archives', set()).discard(year)
+
+
+def years_between(start_day, end_day):
+    return range(day_to_date(start_day).year, day_to_date(end_day).year + 1)
+
+
+def sales_models(session, start_day, end_day):
+    """(Invoice, InvoiceDetail) to query for a sale_day range.
+
+    Ranges that stay in the hot database get the plain models; ranges reaching an
+    archived year get aliases over UNION ALL of the hot and attached archive tables.
+    """
+    years = [y for y in archived_years() if y in years_between(start_day, end_day)]
+    if not years or session.get_bind().dialect.name != 'sqlite':
+        return Invoice, InvoiceDetail
+
+    probe = select(Invoice.id)  # same bind the report queries will get
+    connection = session.connection(bind_arguments={'clause': probe})
+    for year in years:
+        _attach(connection, year)
+
+    models = []
+    for model in (Invoice, InvoiceDetail):
+        table = model.__table__
+        parts = [select(table)] + [select(archive_table(table, year)) for year in years]
+        models.append(aliased(model, union_all(*parts).subquery(table.name), adapt_on_names=True))
+    return tuple(models)
+
+
+def archive_cutoff(keep_months=None, today=None):
+    """First sale_day that stays hot: the start of the month ``keep_months`` before this one."""
+    if keep_months is None:
+        keep_months = current_app.config['ARCHIVE_KEEP_MONTHS']
+    today = today or date.today()
+    months = today.year * 12 + today.month - 1 - keep_months
+    return sale_day(date(months // 12, months % 12 + 1, 1))
+
+
+def archive_closed_months(engine, keep_months=None):
+    """Move invoices older than the cutoff into their year's archive; returns {year: invoices}."""
+    if engine.dialect.name != 'sqlite':
+        raise ArchiveError('archiving to attached files needs SQLite')
+    cutoff = archive_cutoff(keep_months)
+    os.makedirs(archive_folder(), exist_ok=True)
+    moved = {}
+
+    with engine.connect() as connection:
+        first = connection.execute(text("SELECT MIN(sale_day) FROM invoice")).scalar()
+        if first is None or first >= cutoff:
+            return moved
+        for year in years_between(first, cutoff - 1):
+            lo = max(sale_day(date(year, 1, 1)), first)
+            hi = min(sale_day(date(year + 1, 1, 1)), cutoff)
+            count = _archive_year(connection, year, lo, hi)
+            if count:
+                moved[year] = count
+    return moved
+
+
+def _archive_year(connection, year, lo, hi):
+    _attach(connection, year)
+    try:
+        for table in ARCHIVED_TABLES:
+            archive_table(table, year).create(connection, checkfirst=True)
+        connection.commit()
+
+        # The newest invoice and the owner of the newest line stay hot so the rowid
+        # high-water marks survive and new ids never collide with archived ones
+        newest_id = connection.execute(text("SELECT MAX(id) FROM main.invoice")).scalar()
+        newest_line_owner = connection.execute(
+            text("SELECT invoice_id FROM main.invoice_detail ORDER BY id DESC LIMIT 1")
+        ).scalar()
+        invoices = """
+            SELECT id FROM main.invoice
+            WHERE sale_day >= :lo AND sale_day < :hi AND id < :newest_id AND id != :newest_line_owner
+        """
+        params = {'lo': lo, 'hi': hi, 'newest_id': newest_id,
+                  'newest_line_owner': -1 if newest_line_owner is None else newest_line_owner}
+        schema = _schema(year)
+        invoice_cols = ', '.join(c.name for c in Invoice.__table__.columns)
+        detail_cols = ', '.join(c.name for c in InvoiceDetail.__table__.columns)
+        # OR IGNORE: a rerun after a crash between the two files' commits is harmless
+        connection.execute(text(f"""
+            INSERT OR IGNORE INTO {schema}.invoice ({invoice_cols})
+            SELECT {invoice_cols} FROM main.invoice WHERE id IN ({invoices})
+        """), params)
+        connection.execute(text(f"""
+            INSERT OR IGNORE INTO {schema}.invoice_detail ({detail_cols})
+            SELECT {detail_cols} FROM main.invoice_detail WHERE invoice_id IN ({invoices})
+        """), params)
+        connection.execute(text(f"DELETE FROM main.invoice_detail WHERE invoice_id IN ({invoices})"), params)
+        count = connection.execute(text(f"DELETE FROM main.invoice WHERE id IN ({invoices})"), params).rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        _detach(connection, year)
+    return count
@@ -0,0 +1,296 @@
+import csv
+import json
+from datetime import datetime
+
+from sqlalchemy import text
+
+from services.product_codes import invalidate_product_codes
+from services.product_prices import invalidate_product_prices
+from utils.money import format_cents, to_cents
+
+# Catalog files: one record per line/row. Prices are decimal amounts like the API;
+# products name their category, which is created when it doesn't exist yet.
+PRODUCT_FIELDS = ('sku', 'name', 'category', 'price', 'stock', 'description')
+CATEGORY_FIELDS = ('name',)
+FORMATS = ('csv', 'jsonl')
+
+
+class CatalogError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+
+
+def detect_format(filename, default='csv'):
+    if filename and filename.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if filename and filename.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def read_records(stream, fmt):
+    """Yield (line number, dict) without loading the file."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, CatalogError(number, f'invalid JSON ({e})')
+                continue
+            if not isinstance(record, dict):
+                record = CatalogError(number, 'not an object')
+            yield number, record
+
+
+def write_records(stream, fmt, fields, rows):
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fields)
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    for row in rows:
+        stream.write(json.dumps(row) + '\n')
+
+
+def _text(value):
+    value = '' if value is None else str(value).strip()
+    return value or None
+
+
+def _in_params(prefix, values):
+    params = {f'{prefix}{i}': value for i, value in enumerate(values)}
+    return ', '.join(':' + key for key in params), params
+
+
+def parse_product(line, record):
+    name = _text(record.get('name'))
+    category = _text(record.get('category'))
+    if not name:
+        raise CatalogError(line, 'missing name')
+    if not category:
+        raise CatalogError(line, 'missing category')
+    try:
+        price = to_cents(record.get('price'))
+        stock = _text(record.get('stock'))
+        stock = int(stock) if stock is not None else None
+    except ValueError:
+        raise CatalogError(line, 'invalid price or stock')
+    if price < 0 or (stock is not None and stock < 0):
+        raise CatalogError(line, 'price and stock must not be negative')
+    return {
+        'line': line,
+        'sku': _text(record.get('sku')),
+        'name': name,
+        'category': category,
+        'price': price,
+        'stock': stock,
+        'description': _text(record.get('description')),
+    }
+
+
+def _product_key(product):
+    return ('sku', product['sku']) if product['sku'] else ('name', product['name'])
+
+
+def ensure_categories(session, names):
+    """category name -> id, inserting the missing ones in one executemany."""
+    names = list(dict.fromkeys(names))
+    placeholders, params = _in_params('n', names)
+    sql = text(f"SELECT name, MIN(id) AS id FROM category WHERE name IN ({placeholders}) GROUP BY name")
+    ids = {row.name: row.id for row in session.execute(sql, params)}
+    missing = [name for name in names if name not in ids]
+    if missing:
+        now = datetime.now().date()
+        session.execute(text("INSERT INTO category (name, create_at) VALUES (:name, :create_at)"),
+                        [{'name': name, 'create_at': now} for name in missing])
+        ids.update({row.name: row.id for row in session.execute(sql, params)})
+    return ids
+
+
+PRODUCT_INDEX_SQL = "SELECT id, sku, name, price, stock, description, category_id FROM product"
+
+
+def load_product_index(session, after_id=None, index=None):
+    """Import key -> current product row for the whole catalog, loaded once per import.
+
+    Keys are ('sku', sku), or ('name', name) for products without a SKU (the oldest
+    wins when names repeat). ``after_id`` adds only rows created since then.
+    """
+    index = {} if index is None else index
+    sql, params = PRODUCT_INDEX_SQL, {}
+    if after_id is not None:
+        sql, params = sql + " WHERE id > :after_id", {'after_id': after_id}
+    for row in session.execute(text(sql + " ORDER BY id"), params):
+        key = ('sku', row.sku) if row.sku else ('name', row.name)
+        index.setdefault(key, dict(row._mapping))
+    return index
+
+
+def import_products_chunk(session, products, index):
+    """Upsert one chunk in the caller's transaction; returns (inserted, updated, unchanged, rejected).
+
+    Stock changes go through the ledger like the HTTP routes: opening stock is a
+    receipt, a new absolute level on an existing product an adjustment. Rows that
+    only change price/stock skip the search-index trigger; identical rows are skipped.
+    An adjustment is applied with the ledger's guard against going negative (sales
+    since the index was loaded can make it), and ``rejected`` holds a CatalogError
+    for each stock change that wasn't applied; the rest of that row still is.
+    """
+    by_key = {_product_key(p): p for p in products}  # later rows win within the chunk
+    categories = ensure_categories(session, [p['category'] for p in by_key.values()])
+    now = datetime.now()
+
+    inserts, renames, reprices, restocks, movements, rejected = [], [], [], [], [], []
+    unchanged = updated = 0
+    for key, product in by_key.items():
+        row = dict(product, category_id=categories[product['category']])
+        current = index.get(key)
+        if current is None:
+            row['stock'] = product['stock'] or 0
+            row['create_at'] = now.date()
+            inserts.append(row)
+            continue
+        stock = current['stock'] or 0
+        row['id'] = current['id']
+        row['stock'] = stock if product['stock'] is None else product['stock']
+        # Relative, so sales made since the index was loaded aren't overwritten
+        row['delta'] = row['stock'] - stock
+        searchable = any(row[f] != current[f] for f in ('name', 'description', 'category_id'))
+        if not searchable and row['price'] == current['price'] and not row['delta']:
+            unchanged += 1
+            continue
+        if searchable:
+            renames.append(row)
+        elif row['price'] != current['price']:
+            reprices.append(row)
+        if row['delta']:
+            restocks.append((row, current, searchable or row['price'] != current['price']))
+        else:
+            updated += 1
+        current.update((f, row[f]) for f in ('name', 'price', 'description', 'category_id'))
+
+    if inserts:
+        last_id = session.execute(text("SELECT MAX(id) FROM product")).scalar() or 0
+        session.execute(text("""
+            INSERT INTO product (name, sku, price, stock, description, category_id, create_at)
+            VALUES (:name, :sku, :price, :stock, :description, :category_id, :create_at)
+        """), inserts)
+        load_product_index(session, last_id, index)
+        movements += [{'product_id': index[_product_key(p)]['id'], 'kind': 'receipt', 'qty': p['stock']}
+                      for p in inserts if p['stock']]
+    if renames:
+        session.execute(text("""
+            UPDATE product
+            SET name = :name, price = :price, description = :description, category_id = :category_id
+            WHERE id = :id
+        """), renames)
+    if reprices:
+        session.execute(text("UPDATE product SET price = :price WHERE id = :id"), reprices)
+    # One statement per stock change: its rowcount says whether the guard let it through
+    restock = text("""
+        UPDATE product SET stock = COALESCE(stock, 0) + :delta
+        WHERE id = :id AND COALESCE(stock, 0) + :delta >= 0
+    """)
+    for row, current, other_changes in restocks:
+        if session.execute(restock, {'id': row['id'], 'delta': row['delta']}).rowcount:
+            movements.append({'product_id': row['id'], 'kind': 'adjustment', 'qty': row['delta']})
+            current['stock'] = row['stock']
+            updated += 1
+        else:
+            updated += other_changes
+            rejected.append(CatalogError(row['line'], f"stock {row['stock']} not applied: "
+                                                      f"sales since the import started would make it negative"))
+    if movements:
+        session.execute(text("""
+            INSERT INTO stock_movement (product_id, kind, qty, invoice_detail_id, create_at)
+            VALUES (:product_id, :kind, :qty, NULL, :create_at)
+        """), [dict(m, create_at=now) for m in movements])
+    return len(inserts), updated, unchanged, rejected
+
+
+def import_categories_chunk(session, names):
+    before = session.execute(text("SELECT COUNT(*) FROM category")).scalar()
+    ensure_categories(session, names)
+    inserted = session.execute(text("SELECT COUNT(*) FROM category")).scalar() - before
+    return inserted, 0, len(set(names)) - inserted, []
+
+
+def import_catalog(session, records, kind='products', chunk_size=5000, on_error=None):
+    """Upsert ``records`` ((line, dict) pairs) committing every ``chunk_size`` rows.
+
+    Bad rows are skipped and passed to ``on_error``, as are stock changes the
+    ledger refused; returns {'inserted', 'updated', 'unchanged', 'skipped', 'rejected'}.
+    """
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'rejected': 0}
+    chunk = []
+    index = load_product_index(session) if kind == 'products' else None
+
+    def flush():
+        if not chunk:
+            return
+        if kind == 'products':
+            counts = import_products_chunk(session, chunk, index)
+        else:
+            counts = import_categories_chunk(session, chunk)
+        session.commit()
+        *counts, rejected = counts
+        for name, count in zip(('inserted', 'updated', 'unchanged'), counts):
+            stats[name] += count
+        stats['rejected'] += len(rejected)
+        if on_error:
+            for e in rejected:
+                on_error(e)
+        chunk.clear()
+
+    try:
+        for line, record in records:
+            try:
+                if isinstance(record, CatalogError):
+                    raise record
+                if kind == 'products':
+                    chunk.append(parse_product(line, record))
+                else:
+                    name = _text(record.get('name'))
+                    if not name:
+                        raise CatalogError(line, 'missing name')
+                    chunk.append(name)
+            except CatalogError as e:
+                stats['skipped'] += 1
+                if on_error:
+                    on_error(e)
+                continue
+            if len(chunk) >= chunk_size:
+                flush()
+        flush()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        # This process's indexes; other workers catch up within their TTL
+        invalidate_product_codes()
+        invalidate_product_prices()
+    return stats
+
+
+def export_catalog(session, kind='products', batch_size=5000):
+    """Yield export rows, streaming from the database ``batch_size`` at a time."""
+    if kind == 'categories':
+        sql = text("SELECT name FROM category ORDER BY id")
+    else:
+        sql = text("""
+            SELECT p.sku, p.name, c.name AS category, p.price, p.stock, p.description
+            FROM product AS p
+            JOIN category AS c ON p.category_id = c.id
+            ORDER BY p.id
+        """)
+    for row in session.execute(sql.execution_options(yield_per=batch_size)):
+        data = dict(row._mapping)
+        if 'price' in data:
+            data['price'] = format_cents(data['price'])
+        yield data
@@ -0,0 +1,91 @@
+from sqlalchemy import text
+
+from utils.dates import day_to_date, sale_day
+from utils.money import from_cents
+
+# Catalog totals from scratch; what the triggers keep in dashboard_totals on SQLite
+TOTALS_SQL = """
+    SELECT (SELECT COUNT(*) FROM product) AS products,
+           (SELECT COUNT(*) FROM category) AS categories,
+           (SELECT COUNT(*) FROM user) AS users,
+           (SELECT COALESCE(SUM(stock), 0) FROM product) AS stock,
+           (SELECT COALESCE(SUM(COALESCE(price, 0) * stock), 0) FROM product) AS stock_value,
+           (SELECT COUNT(*) FROM product WHERE COALESCE(stock, 0) <= :threshold) AS low_stock,
+           :threshold AS low_stock_threshold
+"""
+DAY_SQL = """
+    SELECT COALESCE(SUM(total_amount), 0) AS total, COUNT(*) AS invoices, COUNT(DISTINCT user_id) AS cashiers
+    FROM invoice WHERE sale_day = :day
+"""
+
+
+def _maintained(session):
+    return session.get_bind().dialect.name == 'sqlite'
+
+
+def _totals(session, threshold):
+    if _maintained(session):
+        row = session.execute(text("SELECT * FROM dashboard_totals WHERE id = 1")).fetchone()
+        if row is not None:
+            return row
+    return session.execute(text(TOTALS_SQL), {'threshold': threshold}).fetchone()
+
+
+def _day(session, day):
+    if not _maintained(session):
+        return session.execute(text(DAY_SQL), {'day': day}).fetchone()
+    return session.execute(text("""
+        SELECT COALESCE((SELECT total FROM daily_sales WHERE sale_day = :day), 0) AS total,
+               COALESCE((SELECT invoices FROM daily_sales WHERE sale_day = :day), 0) AS invoices,
+               (SELECT COUNT(*) FROM daily_cashier WHERE sale_day = :day) AS cashiers
+    """), {'day': day}).fetchone()
+
+
+def dashboard_summary(session, day=None, threshold=5):
+    """Catalog totals and one day's sales (today by default) in two primary key reads.
+
+    ``threshold`` only applies where the totals aren't trigger maintained; on SQLite
+    the row carries the threshold it was counted with.
+    """
+    day = sale_day() if day is None else day
+    totals = _totals(session, threshold)
+    sales = _day(session, day)
+    return {
+        'total_products': totals.products,
+        'total_categories': totals.categories,
+        'total_users': totals.users,
+        'total_stock': totals.stock,
+        'stock_value': from_cents(totals.stock_value),
+        'low_stock': totals.low_stock,
+        'low_stock_threshold': totals.low_stock_threshold,
+        'today': {
+            'date': day_to_date(day),
+            'total_sales': from_cents(sales.total),
+            'total_invoices': sales.invoices,
+            'active_users': sales.cashiers,
+        },
+    }
+
+
+def rebuild_dashboard(session, threshold):
+    """Recount every summary row from the base tables (SQLite), e.g. after a threshold change."""
+    totals = dict(session.execute(text(TOTALS_SQL), {'threshold': threshold}).fetchone()._mapping)
+    session.execute(text("DELETE FROM dashboard_totals"))
+    session.execute(text("""
+        INSERT INTO dashboard_totals (id, products, categories, users, stock, stock_value, low_stock,
+                                      low_stock_threshold)
+        VALUES (1, :products, :categories, :users, :stock, :stock_value, :low_stock, :low_stock_threshold)
+    """), totals)
+    session.execute(text("DELETE FROM daily_cashier"))
+    session.execute(text("DELETE FROM daily_sales"))
+    session.execute(text("""
+        INSERT INTO daily_sales (sale_day, total, invoices)
+        SELECT sale_day, COALESCE(SUM(total_amount), 0), COUNT(*)
+        FROM invoice WHERE sale_day IS NOT NULL GROUP BY sale_day
+    """))
+    session.execute(text("""
+        INSERT INTO daily_cashier (sale_day, user_id, invoices)
+        SELECT sale_day, user_id, COUNT(*)
+        FROM invoice WHERE sale_day IS NOT NULL GROUP BY sale_day, user_id
+    """))
+    return totals
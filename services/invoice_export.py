@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+
+from sqlalchemy import func, select
+
+from model import Product, User
+from services.archive import sales_models
+from utils.dates import day_to_date, sale_day
+from utils.money import format_cents
+
+# One row per invoice line, header fields repeated; invoices without lines get one
+# row with empty line fields. Rows come in invoice id order, so the last complete
+# invoice id is a resume cursor (after_id).
+EXPORT_FIELDS = (
+    'invoice_id', 'invoice_number', 'sale_date', 'customer_name', 'customer_phone', 'payment_method',
+    'cashier', 'invoice_total', 'line_id', 'product_id', 'sku', 'product_name', 'qty', 'price', 'subtotal',
+)
+FORMATS = ('csv', 'jsonl')
+MONEY_FIELDS = ('invoice_total', 'price', 'subtotal')
+FLUSH_BYTES = 64 * 1024
+
+
+def export_query(session, start_day, end_day, after_id=None):
+    """The export select, or None when no invoice matches.
+
+    The invoice id range of the period is looked up first (a scan of the sale_day
+    index) so the main query can walk invoices in rowid order instead of sorting
+    the whole period before the first row comes out.
+    """
+    invoices, lines = sales_models(session, start_day, end_day)
+    in_period = [invoices.sale_day.between(start_day, end_day)]
+    if after_id is not None:
+        in_period.append(invoices.id > after_id)
+    first_id, last_id = session.execute(select(func.min(invoices.id), func.max(invoices.id)).where(*in_period)).one()
+    if first_id is None:
+        return None
+    return (
+        select(
+            invoices.id.label('invoice_id'),
+            invoices.invoice_number,
+            invoices.sale_day.label('sale_date'),
+            invoices.customer_name,
+            invoices.customer_phone,
+            invoices.payment_method,
+            User.name.label('cashier'),
+            invoices.total_amount.label('invoice_total'),
+            lines.id.label('line_id'),
+            lines.product_id,
+            Product.sku,
+            Product.name.label('product_name'),
+            lines.qty,
+            lines.price,
+            lines.subtotal,
+        )
+        .select_from(invoices)
+        .join(User, User.id == invoices.user_id)
+        .outerjoin(lines, lines.invoice_id == invoices.id)
+        .outerjoin(Product, Product.id == lines.product_id)
+        .where(invoices.id.between(first_id, last_id), *in_period)
+        .order_by(invoices.id, lines.id)
+    )
+
+
+def export_rows(session, start_day, end_day, after_id=None, batch_size=1000):
+    """Yield export dicts through a server-side cursor, ``batch_size`` rows in memory at a time."""
+    query = export_query(session, start_day, end_day, after_id)
+    if query is None:
+        return
+    for row in session.execute(query.execution_options(yield_per=batch_size)):
+        data = row._asdict()
+        if data['sale_date'] is not None:
+            data['sale_date'] = day_to_date(data['sale_date']).isoformat()
+        for field in MONEY_FIELDS:
+            data[field] = format_cents(data[field])
+        yield data
+
+
+def encode_rows(rows, fmt):
+    """CSV or JSON Lines text in ~64 KiB chunks."""
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, EXPORT_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(row, separators=(',', ':')) + '\n')
+    for row in rows:
+        write(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def export_range(start=None, end=None):
+    """'YYYY-MM-DD' bounds -> (start_day, end_day); everything up to today when omitted."""
+    start_day = sale_day(start) if start else 0
+    end_day = sale_day(end) if end else sale_day()
+    if start_day > end_day:
+        raise ValueError('start is after end')
+    return start_day, end_day
@@ -0,0 +1,23 @@
+from sqlalchemy import text
+
+
+def adjust_invoice_total(session, invoice_id, amount, lines=0):
+    """Add ``amount`` (cents) to the invoice total and ``lines`` to its line count.
+
+    One relative UPDATE in the caller's transaction, so concurrent line edits
+    on the same invoice never overwrite each other's totals.
+    """
+    session.execute(text("""
+        UPDATE invoice
+        SET total_amount = COALESCE(total_amount, 0) + :amount,
+            line_count = COALESCE(line_count, 0) + :lines
+        WHERE id = :invoice_id
+    """), {'amount': amount, 'lines': lines, 'invoice_id': invoice_id})
+
+
+def invoice_total(session, invoice_id):
+    row = session.execute(
+        text("SELECT total_amount, line_count FROM invoice WHERE id = :invoice_id"),
+        {'invoice_id': invoice_id}
+    ).fetchone()
+    return (row.total_amount or 0, row.line_count or 0) if row else (0, 0)
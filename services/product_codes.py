@@ -0,0 +1,78 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from utils.money import money_row
+
+# sku -> product payload, so a scan resolves without touching the database.
+# Stock is left out on purpose: it changes with every sale, price and name don't.
+_by_code = {}
+_loaded_at = None
+_lock = threading.Lock()
+
+PRODUCT_CODE_SQL = """
+    SELECT p.id, p.sku, UPPER(p.name) AS product_name, p.price, p.description,
+           p.image, p.category_id, c.name AS category_name
+    FROM product AS p
+    JOIN category AS c ON p.category_id = c.id
+"""
+
+
+def warm_product_codes(session):
+    """(Re)load the whole sku map in one query."""
+    global _by_code, _loaded_at
+    rows = session.execute(text(PRODUCT_CODE_SQL + " WHERE p.sku IS NOT NULL")).fetchall()
+    codes = {row.sku: money_row(row, 'price') for row in rows}
+    with _lock:
+        _by_code = codes
+        _loaded_at = time.monotonic()
+
+
+def warm_at_startup(app, db):
+    with app.app_context():
+        try:
+            warm_product_codes(db.session)
+        except SQLAlchemyError:
+            app.logger.warning('product code index not warmed (run `flask db upgrade`)')
+        finally:
+            db.session.remove()
+
+
+def invalidate_product_codes():
+    """Force a reload on the next lookup (e.g. after a category rename)."""
+    global _loaded_at
+    _loaded_at = None
+
+
+def _expired():
+    # Other workers write too; the TTL bounds how long their changes stay invisible here
+    return _loaded_at is None or time.monotonic() - _loaded_at > current_app.config['PRODUCT_CODE_TTL']
+
+
+def lookup_product_code(session, code):
+    if _expired():
+        warm_product_codes(session)
+    product = _by_code.get(code)
+    if product is None:
+        # Possibly created by another worker since the last load
+        product = refresh_product_code(session, code)
+    return product
+
+
+def refresh_product_code(session, code):
+    row = session.execute(text(PRODUCT_CODE_SQL + " WHERE p.sku = :sku"), {'sku': code}).fetchone()
+    with _lock:
+        if row is None:
+            _by_code.pop(code, None)
+            return None
+        _by_code[code] = money_row(row, 'price')
+        return _by_code[code]
+
+
+def discard_product_code(code):
+    if code:
+        with _lock:
+            _by_code.pop(code, None)
@@ -0,0 +1,116 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+# product_id -> list price in cents, the only price an invoice line is charged unless overridden
+_prices = {}
+_loaded_at = None
+_lock = threading.Lock()
+
+
+class UnknownProduct(LookupError):
+    def __init__(self, product_ids):
+        super().__init__(f'Unknown products: {product_ids}')
+        self.product_ids = product_ids
+
+
+def warm_product_prices(session):
+    """(Re)load every list price in one query."""
+    global _prices, _loaded_at
+    rows = session.execute(text("SELECT id, price FROM product")).fetchall()
+    prices = {row.id: row.price or 0 for row in rows}
+    with _lock:
+        _prices = prices
+        _loaded_at = time.monotonic()
+
+
+def warm_prices_at_startup(app, db):
+    with app.app_context():
+        try:
+            warm_product_prices(db.session)
+        except SQLAlchemyError:
+            app.logger.warning('product price index not warmed (run `flask db upgrade`)')
+        finally:
+            db.session.remove()
+
+
+def invalidate_product_prices():
+    global _loaded_at
+    _loaded_at = None
+
+
+def _expired():
+    # Same bound as the barcode index: other workers' price edits show up within the TTL
+    return _loaded_at is None or time.monotonic() - _loaded_at > current_app.config['PRODUCT_PRICE_TTL']
+
+
+def product_prices(session, product_ids):
+    """product_id -> list price for a whole basket; ids missing from the index cost one query together."""
+    if _expired():
+        warm_product_prices(session)
+    prices = {pid: _prices[pid] for pid in product_ids if pid in _prices}
+    missing = [pid for pid in product_ids if pid not in prices]
+    if missing:
+        # Possibly created by another worker since the last load
+        params = {f'id{i}': pid for i, pid in enumerate(missing)}
+        sql = text(f"SELECT id, price FROM product WHERE id IN ({', '.join(':' + key for key in params)})")
+        found = {row.id: row.price or 0 for row in session.execute(sql, params)}
+        with _lock:
+            _prices.update(found)
+        prices.update(found)
+    unknown = [pid for pid in product_ids if pid not in prices]
+    if unknown:
+        raise UnknownProduct(unknown)
+    return prices
+
+
+def price_basket(session, items):
+    """Price ``items`` ({'product_id', 'qty', optional 'price' in cents}) against the list prices.
+
+    A client price only wins when it is given and differs from the list price;
+    such lines come back with ``override`` set so the caller can audit them.
+    """
+    prices = product_prices(session, list(dict.fromkeys(item['product_id'] for item in items)))
+    lines = []
+    for item in items:
+        list_price = prices[item['product_id']]
+        price = item.get('price')
+        override = price is not None and price != list_price
+        if price is None:
+            price = list_price
+        lines.append({
+            'product_id': item['product_id'],
+            'qty': item['qty'],
+            'price': price,
+            'list_price': list_price,
+            'subtotal': item['qty'] * price,
+            'override': override,
+        })
+    return lines
+
+
+def record_price_override(session, line, invoice_detail_id, reason=None, user_id=None):
+    session.execute(text("""
+        INSERT INTO price_override (invoice_detail_id, product_id, list_price, price, reason, user_id, create_at)
+        VALUES (:invoice_detail_id, :product_id, :list_price, :price, :reason, :user_id, CURRENT_TIMESTAMP)
+    """), {
+        'invoice_detail_id': invoice_detail_id,
+        'product_id': line['product_id'],
+        'list_price': line['list_price'],
+        'price': line['price'],
+        'reason': reason,
+        'user_id': user_id,
+    })
+
+
+def set_product_price(product_id, price):
+    with _lock:
+        _prices[product_id] = price or 0
+
+
+def discard_product_price(product_id):
+    with _lock:
+        _prices.pop(product_id, None)
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import text
+
+from services.product_prices import UnknownProduct
+from utils.periodic import start_periodic
+
+MOVEMENT_KINDS = {'sale', 'return', 'adjustment', 'receipt'}
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_id, qty):
+        super().__init__(f'Insufficient stock for product {product_id}')
+        self.product_id = product_id
+        self.qty = qty
+
+
+def apply_movement(session, product_id, qty, kind, invoice_detail_id=None):
+    """Change product.stock by ``qty`` (signed) and record it in the ledger.
+
+    Decrements are a single conditional UPDATE, so two checkouts racing for the
+    last unit can't both win and nothing is read-modified-written in Python.
+    Runs in the caller's transaction; raises OutOfStock when there isn't enough
+    stock and UnknownProduct when the product row is gone.
+    """
+    if kind not in MOVEMENT_KINDS:
+        raise ValueError(f'Unknown stock movement {kind!r}')
+    if qty == 0:
+        return
+    if qty < 0:
+        result = session.execute(
+            text("UPDATE product SET stock = stock + :qty WHERE id = :product_id AND stock >= :needed"),
+            {'qty': qty, 'product_id': product_id, 'needed': -qty}
+        )
+    else:
+        result = session.execute(
+            text("UPDATE product SET stock = COALESCE(stock, 0) + :qty WHERE id = :product_id"),
+            {'qty': qty, 'product_id': product_id}
+        )
+    if result.rowcount == 0:
+        exists = qty < 0 and session.execute(
+            text("SELECT 1 FROM product WHERE id = :product_id"), {'product_id': product_id}
+        ).first() is not None
+        if not exists:
+            raise UnknownProduct([product_id])
+        raise OutOfStock(product_id, -qty)
+    session.execute(text("""
+        INSERT INTO stock_movement (product_id, kind, qty, invoice_detail_id, create_at)
+        VALUES (:product_id, :kind, :qty, :invoice_detail_id, :create_at)
+    """), {
+        'product_id': product_id,
+        'kind': kind,
+        'qty': qty,
+        'invoice_detail_id': invoice_detail_id,
+        'create_at': datetime.now()
+    })
+
+
+def return_stock(session, product_id, qty, invoice_detail_id=None):
+    """Put a removed sale line's ``qty`` back; a line can outlive its product, which then has nothing to return to."""
+    try:
+        apply_movement(session, product_id, qty, 'return', invoice_detail_id)
+    except UnknownProduct:
+        pass
+
+
+def current_stock(session, product_ids):
+    """product_id -> stock, one primary-key lookup per id batch."""
+    if not product_ids:
+        return {}
+    params = {f'id{i}': product_id for i, product_id in enumerate(product_ids)}
+    sql = text(f"SELECT id, stock FROM product WHERE id IN ({', '.join(':' + key for key in params)})")
+    return {row.id: row.stock or 0 for row in session.execute(sql, params)}
+
+
+def compact_stock_ledger(session, before):
+    """Fold movements created before ``before`` into stock_snapshot and delete them."""
+    cutoff = session.execute(
+        text("SELECT MAX(id) FROM stock_movement WHERE create_at < :before"), {'before': before}
+    ).scalar()
+    if cutoff is None:
+        return 0
+    session.execute(text("""
+        INSERT INTO stock_snapshot (product_id, qty, last_movement_id, create_at)
+        SELECT product_id, SUM(qty), MAX(id), :now
+        FROM stock_movement
+        WHERE id <= :cutoff
+        GROUP BY product_id
+        ON CONFLICT (product_id) DO UPDATE
+        SET qty = stock_snapshot.qty + excluded.qty,
+            last_movement_id = excluded.last_movement_id,
+            create_at = excluded.create_at
+    """), {'cutoff': cutoff, 'now': datetime.now()})
+    removed = session.execute(
+        text("DELETE FROM stock_movement WHERE id <= :cutoff"), {'cutoff': cutoff}
+    ).rowcount
+    session.commit()
+    return removed
+
+
+def stock_mismatches(session):
+    """Products whose stock column disagrees with snapshot + ledger."""
+    sql = text("""
+        SELECT p.id, p.stock,
+               COALESCE(s.qty, 0) + COALESCE(m.qty, 0) AS ledger_stock
+        FROM product AS p
+        LEFT JOIN stock_snapshot AS s ON s.product_id = p.id
+        LEFT JOIN (SELECT product_id, SUM(qty) AS qty FROM stock_movement GROUP BY product_id) AS m
+               ON m.product_id = p.id
+        WHERE COALESCE(p.stock, 0) != COALESCE(s.qty, 0) + COALESCE(m.qty, 0)
+    """)
+    return [dict(row._mapping) for row in session.execute(sql)]
+
+
+def start_stock_compaction(app, db):
+    """Compact the ledger every STOCK_COMPACT_INTERVAL seconds on a daemon thread (0 = off)."""
+    def task():
+        before = datetime.now() - timedelta(days=current_app.config['STOCK_COMPACT_AGE_DAYS'])
+        compact_stock_ledger(db.session, before)
+
+    return start_periodic(app, 'stock-compaction', app.config['STOCK_COMPACT_INTERVAL'], task)
@@ -0,0 +1,109 @@
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional: br is only offered when installed
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # optional: zstd is only offered when installed
+    zstandard = None
+
+# Text payloads worth compressing; images, archives and anything already encoded are left alone
+COMPRESSIBLE = {
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html',
+    'text/css', 'application/javascript', 'text/javascript', 'image/svg+xml',
+}
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+# Content-Encoding token -> (compressor, level config key)
+ENCODINGS = {
+    'gzip': (_Gzip, 'COMPRESS_GZIP_LEVEL'),
+    'br': (_Brotli, 'COMPRESS_BR_LEVEL'),
+    'zstd': (_Zstd, 'COMPRESS_ZSTD_LEVEL'),
+}
+
+
+def available_encodings(preferred):
+    installed = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+    return [name for name in preferred if installed.get(name)]
+
+
+def compress_chunks(encoding, chunks, level):
+    """Compress an iterable of bytes incrementally, yielding output as the compressor emits it."""
+    compressor = ENCODINGS[encoding][0](level)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _compress_response(response):
+    if (response.direct_passthrough  # files (static/images) and X-Sendfile
+            or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in COMPRESSIBLE):
+        return response
+    response.vary.add('Accept-Encoding')
+    config = current_app.config
+    encoding = request.accept_encodings.best_match(config['COMPRESS_ENCODINGS'])
+    if encoding is None:
+        return response
+    level = config[ENCODINGS[encoding][1]]
+
+    if response.is_streamed:
+        # No size known up front: compress as the generator produces
+        response.response = compress_chunks(encoding, response.response, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < config['COMPRESS_MIN_BYTES']:
+            return response
+        response.set_data(b''.join(compress_chunks(encoding, [body], level)))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)  # same entity, different bytes
+    return response
+
+
+def init_compression(app):
+    app.config['COMPRESS_ENCODINGS'] = available_encodings(app.config['COMPRESS_ALGORITHMS'])
+    if app.config['COMPRESS_ENCODINGS']:
+        app.after_request(_compress_response)
@@ -0,0 +1,81 @@
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+READ_BIND = 'read'
+READ_METHODS = {'GET', 'HEAD'}
+READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes'
+
+
+def apply_pragmas(engine, pragmas):
+    """Run the configured PRAGMAs on every connection the engine opens."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def configure_engines(app, db):
+    with app.app_context():
+        apply_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+        if app.config['DB_READ_ROUTING']:
+            apply_pragmas(db.engines[READ_BIND], app.config['SQLITE_READ_PRAGMAS'])
+
+
+def read_your_writes():
+    """Send the rest of this request's queries to the primary."""
+    g.read_your_writes = True
+
+
+def _wants_read_engine():
+    if not has_request_context() or request.method not in READ_METHODS:
+        return False
+    if not current_app.config['DB_READ_ROUTING']:
+        return False
+    if g.get('read_your_writes'):
+        return False
+    if request.headers.get(READ_YOUR_WRITES_HEADER, '').lower() in ('1', 'true', 'yes'):
+        g.read_your_writes = True
+        return False
+    return True
+
+
+class RoutingSession(Session):
+    """Sends GET/HEAD reads to the ``read`` bind and everything else to the primary.
+
+    Writes (flushes and DML statements) always go to the primary. Once a request
+    has written, the rest of it reads from the primary too, across commits (a GET
+    that stores a row and reads it back must not ask a lagging replica); outside
+    requests the same holds per transaction.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get('wrote'):
+            if self._flushing or getattr(clause, 'is_dml', False):
+                self.info['wrote'] = True
+                if has_request_context():
+                    read_your_writes()
+            elif _wants_read_engine():
+                return self._db.engines[READ_BIND]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self):
+        try:
+            super().commit()
+        finally:
+            self.info.pop('wrote', None)
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self.info.pop('wrote', None)
+
+    def close(self):
+        self.info.pop('wrote', None)
+        super().close()
@@ -0,0 +1,20 @@
+from datetime import date, datetime, timedelta
+
+# invoice.sale_day / invoice_detail.sale_day: whole days since this date, so a
+# period filter is an integer range on an index instead of date() on every row
+EPOCH = date(1970, 1, 1)
+
+
+def sale_day(value=None):
+    """date, datetime or 'YYYY-MM-DD[ ...]' string -> days since EPOCH; today when None."""
+    if value is None:
+        value = date.today()
+    elif isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    elif isinstance(value, datetime):
+        value = value.date()
+    return (value - EPOCH).days
+
+
+def day_to_date(day):
+    return EPOCH + timedelta(days=day)
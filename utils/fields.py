@@ -0,0 +1,29 @@
+from flask import jsonify, request
+
+
+class FieldError(ValueError):
+    def __init__(self, unknown, allowed):
+        super().__init__(f"Unknown fields: {', '.join(unknown)}" if unknown else 'fields is empty')
+        self.unknown = unknown
+        self.allowed = list(allowed)
+
+
+def requested_fields(columns):
+    """Names from ``?fields=a,b`` checked against ``columns`` (name -> SQL expression); all of them when absent."""
+    raw = request.args.get('fields')
+    if raw is None:
+        return list(columns)
+    names = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in names if name not in columns]
+    if unknown or not names:
+        raise FieldError(unknown, columns)
+    return names
+
+
+def select_list(columns, fields):
+    """SELECT list for just the requested fields, so omitted columns are never read or computed."""
+    return ', '.join(f'{columns[name]} AS {name}' for name in fields)
+
+
+def field_error(e):
+    return jsonify({'error': str(e), 'allowed': e.allowed}), 400
@@ -0,0 +1,72 @@
+import logging
+import os
+import time
+
+from flask import current_app
+from sqlalchemy import text
+
+from utils.periodic import start_periodic
+
+logger = logging.getLogger(__name__)
+
+# Sidecar files that belong to an image (precompressed copies, interrupted uploads)
+SIDECAR_SUFFIXES = ('.br', '.gz', '.part')
+
+
+def referenced_images(session):
+    """File names referenced by product.image or user.image, in one query."""
+    sql = text("""
+        SELECT image FROM product WHERE image IS NOT NULL
+        UNION
+        SELECT image FROM user WHERE image IS NOT NULL
+    """)
+    return {os.path.basename(row[0]) for row in session.execute(sql) if row[0]}
+
+
+def collect_orphaned_images(session, grace_seconds=None, dry_run=False):
+    """Delete upload files no row points at and that are older than the grace period.
+
+    The grace period covers uploads whose row has not been committed yet.
+    """
+    if grace_seconds is None:
+        grace_seconds = current_app.config['IMAGE_GC_GRACE_SECONDS']
+    folder = current_app.config['UPLOAD_FOLDER']
+    referenced = referenced_images(session)
+    session.close()  # don't hold a connection while walking the disk
+
+    cutoff = time.time() - grace_seconds
+    report = {'scanned': 0, 'removed': 0, 'bytes_reclaimed': 0, 'files': []}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            report['scanned'] += 1
+            name = entry.name
+            for suffix in SIDECAR_SUFFIXES:
+                if name.endswith(suffix):
+                    name = name[:-len(suffix)]
+                    break
+            if name in referenced and not entry.name.endswith('.part'):
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue  # another worker got there first
+            report['removed'] += 1
+            report['bytes_reclaimed'] += stat.st_size
+            report['files'].append(entry.name)
+    return report
+
+
+def start_image_gc(app, db):
+    """Run the collector every IMAGE_GC_INTERVAL seconds on a daemon thread (0 = off)."""
+    def task():
+        report = collect_orphaned_images(db.session)
+        logger.info('image gc: removed %s files, reclaimed %s bytes',
+                    report['removed'], report['bytes_reclaimed'])
+
+    return start_periodic(app, 'image-gc', app.config['IMAGE_GC_INTERVAL'], task)
@@ -0,0 +1,73 @@
+import dataclasses
+import decimal
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib provider below gives the same output, slower
+    orjson = None
+
+# Wire format for both providers: dates and datetimes as ISO 8601 ('2024-05-01',
+# '2024-05-01T13:45:00'), Decimal as a string so amounts never pick up float noise.
+# SQLite hands raw text() rows back as the stored strings, so listings type their
+# date columns with text().columns(create_at=db.DateTime) to reach _default.
+
+
+def _default(o):
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class ISOJSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider with ISO dates instead of HTTP dates."""
+
+    default = staticmethod(_default)
+
+
+class ORJSONProvider(ISOJSONProvider):
+    """orjson-backed provider: the response body is built as bytes without a str round trip."""
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dump_bytes(self, obj, indent=False):
+        return orjson.dumps(obj, default=_default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:  # json.dumps options (cls, separators, ...) only the stdlib understands
+            return super().dumps(obj, **kwargs)
+        return self._dump_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self._dump_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the JSON provider named by JSON_PROVIDER ('orjson' falls back to 'stdlib' when missing)."""
+    if app.config['JSON_PROVIDER'] == 'orjson' and orjson is not None:
+        app.json = ORJSONProvider(app)
+    else:
+        app.json = ISOJSONProvider(app)
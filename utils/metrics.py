@@ -0,0 +1,199 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, got_request_exception, has_request_context, request
+from sqlalchemy import event
+
+# Request latency histogram buckets (seconds), Prometheus style: each bucket counts le=bound
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Each thread writes only to its own shard, so recording never takes a lock; the
+# /metrics scrape merges the shards. Shards of finished threads are folded into
+# _retired so the threaded dev server doesn't grow the list forever.
+_local = threading.local()
+_shards = []  # (thread, shard)
+_shards_lock = threading.Lock()  # guards _shards/_retired membership, not the counters
+_retired = {}
+
+
+class Series:
+    __slots__ = ('buckets', 'duration', 'requests', 'statuses', 'sql_count', 'sql_seconds',
+                 'sql_rows', 'response_bytes', 'exceptions')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+        self.duration = 0.0
+        self.requests = 0
+        self.statuses = {}
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.sql_rows = 0
+        self.response_bytes = 0
+        self.exceptions = {}
+
+    def merge(self, other):
+        for i, count in enumerate(other.buckets):
+            self.buckets[i] += count
+        self.duration += other.duration
+        self.requests += other.requests
+        for key, count in list(other.statuses.items()):
+            self.statuses[key] = self.statuses.get(key, 0) + count
+        self.sql_count += other.sql_count
+        self.sql_seconds += other.sql_seconds
+        self.sql_rows += other.sql_rows
+        self.response_bytes += other.response_bytes
+        for key, count in list(other.exceptions.items()):
+            self.exceptions[key] = self.exceptions.get(key, 0) + count
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def _series():
+    key = (request.endpoint or 'unmatched', request.method)
+    shard = _shard()
+    series = shard.get(key)
+    if series is None:
+        series = shard[key] = Series()
+    return series
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql = [0, 0.0, 0]  # statements, seconds, rows
+
+
+def _after_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    series = _series()
+    series.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+    series.duration += elapsed
+    series.requests += 1
+    series.statuses[response.status_code] = series.statuses.get(response.status_code, 0) + 1
+    sql_count, sql_seconds, sql_rows = g.pop('metrics_sql', (0, 0.0, 0))
+    series.sql_count += sql_count
+    series.sql_seconds += sql_seconds
+    series.sql_rows += sql_rows
+    if not response.is_streamed:
+        series.response_bytes += response.calculate_content_length() or 0
+    return response
+
+
+def _request_exception(sender, exception, **extra):
+    series = _series()
+    name = type(exception).__name__
+    series.exceptions[name] = series.exceptions.get(name, 0) + 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'metrics_sql' in g:
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    sql = g.get('metrics_sql') if has_request_context() else None
+    if sql is None:
+        return
+    sql[0] += 1
+    sql[1] += elapsed
+    # Drivers report rows for DML (and for SELECT on e.g. psycopg); sqlite3 says -1 for SELECT
+    if cursor.rowcount > 0:
+        sql[2] += cursor.rowcount
+
+
+def _handle_error(context):
+    started = context.connection.info.get('metrics_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def init_metrics(app, db):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    got_request_exception.connect(_request_exception, app)
+    with app.app_context():
+        for engine in set(db.engines.values()):
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+                event.listen(engine, 'handle_error', _handle_error)
+
+
+def snapshot():
+    """Merge every thread's shard: {(endpoint, method): Series}."""
+    merged = {}
+    with _shards_lock:
+        alive = []
+        for thread, shard in _shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                _merge_into(_retired, shard)
+        _shards[:] = alive
+        shards = [_retired] + [shard for _, shard in alive]
+    for shard in shards:
+        _merge_into(merged, shard)
+    return merged
+
+
+def _merge_into(target, shard):
+    for key, series in list(shard.items()):
+        target.setdefault(key, Series()).merge(series)
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}'
+
+
+def render_prometheus(merged):
+    """Prometheus text exposition (version 0.0.4) of a snapshot()."""
+    lines = [
+        '# HELP app_request_duration_seconds Request latency by endpoint.',
+        '# TYPE app_request_duration_seconds histogram',
+    ]
+    items = sorted(merged.items())
+    for (endpoint, method), s in items:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), s.buckets):
+            cumulative += count
+            lines.append(f'app_request_duration_seconds_bucket'
+                         f'{_labels(endpoint=endpoint, method=method, le=bound)} {cumulative}')
+        lines.append(f'app_request_duration_seconds_sum{_labels(endpoint=endpoint, method=method)} {s.duration:.6f}')
+        lines.append(f'app_request_duration_seconds_count{_labels(endpoint=endpoint, method=method)} {s.requests}')
+
+    counters = (
+        ('app_sql_statements_total', 'SQL statements executed while handling requests.', 'sql_count'),
+        ('app_sql_duration_seconds_total', 'Time spent in SQL statements.', 'sql_seconds'),
+        ('app_sql_rows_total', 'Rows reported by the driver (affected, or returned where supported).', 'sql_rows'),
+        ('app_response_bytes_total', 'Response body bytes (streamed responses excluded).', 'response_bytes'),
+    )
+    lines += ['# HELP app_requests_total Responses by endpoint and status.', '# TYPE app_requests_total counter']
+    for (endpoint, method), s in items:
+        for status, count in sorted(s.statuses.items()):
+            lines.append(f'app_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+    lines += ['# HELP app_exceptions_total Unhandled exceptions by endpoint and type.',
+              '# TYPE app_exceptions_total counter']
+    for (endpoint, method), s in items:
+        for name, count in sorted(s.exceptions.items()):
+            lines.append(f'app_exceptions_total{_labels(endpoint=endpoint, method=method, exception=name)} {count}')
+    for name, help_text, attr in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (endpoint, method), s in items:
+            value = getattr(s, attr)
+            value = f'{value:.6f}' if isinstance(value, float) else value
+            lines.append(f'{name}{_labels(endpoint=endpoint, method=method)} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,57 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Money is stored as integer cents (price, subtotal, total_amount, total_sales) so SUMs
+# stay exact and run on integers; the API still speaks decimal amounts like 12.5.
+CENT = Decimal('0.01')
+
+
+def to_cents(value):
+    """'12.345', 12.5 or Decimal -> 1235 / 1250, half up. Raises ValueError on junk."""
+    if value is None or isinstance(value, bool):
+        raise ValueError(value)
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(value)
+    if not amount.is_finite():
+        raise ValueError(value)
+    return int(amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_cents(cents):
+    """1250 -> 12.5 for JSON; n / 100 always prints as the exact two-decimal amount."""
+    if cents is None:
+        return None
+    return int(cents) / 100
+
+
+def format_cents(cents):
+    return None if cents is None else f'{int(cents) / 100:.2f}'
+
+
+def money_row(row, *fields):
+    """dict(row) with the given cent columns converted to amounts."""
+    data = dict(row._mapping) if hasattr(row, '_mapping') else dict(row)
+    for field in fields:
+        if field in data:
+            data[field] = from_cents(data[field])
+    return data
+
+
+def money_rows(rows, *fields):
+    """money_row for a whole result, resolving column names and positions once."""
+    rows = list(rows)
+    if not rows:
+        return []
+    keys = list(rows[0]._fields)
+    positions = [keys.index(field) for field in fields if field in keys]
+    if not positions:
+        return [dict(zip(keys, row)) for row in rows]
+    out = []
+    for row in rows:
+        values = list(row)
+        for i in positions:
+            if values[i] is not None:
+                values[i] = int(values[i]) / 100
+        out.append(dict(zip(keys, values)))
+    return out
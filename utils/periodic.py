@@ -0,0 +1,24 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def start_periodic(app, name, interval, task):
+    """Call ``task()`` in an app context every ``interval`` seconds on a daemon thread (0 = off)."""
+    if not interval:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    task()
+            except Exception:
+                logger.exception('%s failed', name)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
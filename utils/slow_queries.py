@@ -0,0 +1,152 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Opt-in (SLOW_QUERY_MS > 0): statements slower than the threshold go into a ring
+# buffer; the first time a statement shape is seen slow, its plan is captured too.
+MAX_PLANS = 500
+
+_recent = deque(maxlen=100)
+_plans = OrderedDict()  # fingerprint -> {'sql', 'plan'}
+_plans_lock = threading.Lock()
+_threshold = None
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_NAMED = re.compile(r'(?<!:):\w+|%\(\w+\)s')
+
+
+def normalize_sql(statement):
+    """Collapse whitespace, literals and IN lists so one query shape gets one fingerprint."""
+    sql = ' '.join(statement.split())
+    sql = _STRING.sub('?', sql)
+    sql = _NAMED.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _IN_LIST.sub('(?+)', sql)
+
+
+def fingerprint(sql):
+    return hashlib.sha1(sql.encode('utf-8')).hexdigest()[:16]
+
+
+def params_shape(parameters, executemany):
+    """Types of the bound values, not the values themselves (they may be personal data)."""
+    if executemany:
+        rows = list(parameters)
+        return {'executemany': len(rows), 'row': params_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def _explain(cursor, dialect_name, statement, parameters, executemany):
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect_name == 'sqlite' else 'EXPLAIN '
+    if executemany:
+        parameters = next(iter(parameters), ())
+    explain = cursor.connection.cursor()
+    try:
+        explain.execute(prefix + statement, parameters)
+        # SQLite rows are (id, parent, notused, detail); PostgreSQL returns one text column
+        return [str(row[-1]) for row in explain.fetchall()]
+    except Exception as e:  # the plan is best effort; never fail the real query over it
+        return [f'EXPLAIN failed: {e}']
+    finally:
+        explain.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('slow_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('slow_query_started')
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    if elapsed_ms < _threshold:
+        return
+
+    sql = normalize_sql(statement)
+    key = fingerprint(sql)
+    if key not in _plans:
+        plan = _explain(cursor, conn.dialect.name, statement, parameters, executemany)
+        with _plans_lock:
+            _plans[key] = {'sql': sql, 'plan': plan}
+            while len(_plans) > MAX_PLANS:
+                _plans.popitem(last=False)
+    _recent.append({
+        'at': datetime.now().isoformat(timespec='seconds'),
+        'fingerprint': key,
+        'duration_ms': round(elapsed_ms, 2),
+        'sql': sql,
+        'params': params_shape(parameters, executemany),
+        'endpoint': request.endpoint if has_request_context() else None,
+    })
+
+
+def _handle_error(context):
+    started = context.connection.info.get('slow_query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def init_slow_query_log(app, db):
+    global _recent, _threshold
+    if not app.config['SLOW_QUERY_MS']:
+        return
+    _threshold = app.config['SLOW_QUERY_MS']
+    if _recent.maxlen != app.config['SLOW_QUERY_LOG_SIZE']:
+        _recent = deque(_recent, maxlen=app.config['SLOW_QUERY_LOG_SIZE'])
+    with app.app_context():
+        for engine in set(db.engines.values()):
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+                event.listen(engine, 'handle_error', _handle_error)
+
+
+def slow_query_report():
+    """Recent slow statements plus a per-fingerprint summary with the captured plan."""
+    recent = list(_recent)
+    summary = {}
+    for entry in recent:
+        item = summary.get(entry['fingerprint'])
+        if item is None:
+            plan = _plans.get(entry['fingerprint'], {})
+            item = summary[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'sql': entry['sql'],
+                'plan': plan.get('plan'),
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'endpoints': set(),
+            }
+        item['count'] += 1
+        item['total_ms'] += entry['duration_ms']
+        item['max_ms'] = max(item['max_ms'], entry['duration_ms'])
+        if entry['endpoint']:
+            item['endpoints'].add(entry['endpoint'])
+    statements = sorted(summary.values(), key=lambda item: item['total_ms'], reverse=True)
+    for item in statements:
+        item['total_ms'] = round(item['total_ms'], 2)
+        item['endpoints'] = sorted(item['endpoints'])
+    return {
+        'enabled': _threshold is not None,
+        'threshold_ms': _threshold,
+        'statements': statements,
+        'recent': recent[::-1],
+    }
+
+
+def clear_slow_queries():
+    _recent.clear()
+    with _plans_lock:
+        _plans.clear()
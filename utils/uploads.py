@@ -0,0 +1,97 @@
+import os
+import struct
+import uuid
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+# JPEG start-of-frame markers (C4, C8 and CC are DHT/JPG/DAC, not frames)
+# Sniffed kind -> extension the file is stored (and so served) under
+EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'gif': 'gif'}
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadError(ValueError):
+    pass
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def sniff_image(head):
+    for signature, kind in SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    return None
+
+
+def image_size(kind, head):
+    """Read (width, height) from the image header without decoding pixels."""
+    if kind == 'png' and len(head) >= 24:
+        return struct.unpack('>II', head[16:24])
+    if kind == 'gif' and len(head) >= 10:
+        return struct.unpack('<HH', head[6:10])
+    if kind == 'jpeg':
+        i = 2
+        while i + 9 <= len(head):
+            if head[i] != 0xFF:
+                return None
+            marker = head[i + 1]
+            if marker in JPEG_SOF:
+                height, width = struct.unpack('>HH', head[i + 5:i + 9])
+                return width, height
+            i += 2 + struct.unpack('>H', head[i + 2:i + 4])[0]
+    return None
+
+
+def save_image(file_storage):
+    """Stream an uploaded image into UPLOAD_FOLDER and return its public URL.
+
+    The first chunk is checked (magic bytes, declared dimensions) before anything
+    touches the upload folder, and the size cap is enforced while copying.
+    """
+    filename = file_storage.filename or ''
+    if not allowed_file(filename):
+        raise UploadError('Invalid image file type')
+
+    stream = file_storage.stream
+    head = stream.read(CHUNK_SIZE)
+    # Trust the bytes, not the name: plenty of PNGs arrive named .jpg, and are stored as .png
+    kind = sniff_image(head)
+    if kind is None:
+        raise UploadError('Invalid image file type')
+
+    size = image_size(kind, head)
+    if size and size[0] * size[1] > current_app.config['UPLOAD_MAX_IMAGE_PIXELS']:
+        raise UploadError('Image dimensions too large')
+
+    max_bytes = current_app.config['UPLOAD_MAX_IMAGE_BYTES']
+    folder = current_app.config['UPLOAD_FOLDER']
+    stem = secure_filename(filename).rsplit('.', 1)[0] or 'image'
+    image_path = os.path.join(folder, f"{uuid.uuid4().hex}_{stem}.{EXTENSIONS[kind]}")
+    part_path = image_path + '.part'
+    written = 0
+    try:
+        with open(part_path, 'wb') as out:
+            chunk = head
+            while chunk:
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadError('Image file too large')
+                out.write(chunk)
+                chunk = stream.read(CHUNK_SIZE)
+        os.replace(part_path, image_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    return f"/{image_path.replace(os.sep, '/')}"